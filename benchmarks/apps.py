@@ -0,0 +1,80 @@
+"""Synthetic SWAIG apps for benchmarks: N functions with nested SWAIGArgument schemas."""
+import asyncio
+
+from flask import Flask
+
+from signalwire_swaig import AsyncSWAIG, SWAIG, SWAIGArgument, SWAIGArgumentItems, SWAIGFunctionProperties
+from signalwire_swaig.swaig import build_schema
+
+AUTH = ("bench", "secret")
+
+
+def synthetic_arguments():
+    return dict(
+        query=SWAIGArgument(type="string", description="Search query", required=True),
+        limit=SWAIGArgument(type="integer", description="Maximum results", default=10),
+        mode=SWAIGArgument(type="string", description="Search mode", enum=["fast", "full"]),
+        items=SWAIGArgument(
+            type="array",
+            description="Line items",
+            items=SWAIGArgumentItems(
+                type="object",
+                properties={
+                    "sku": SWAIGArgument(type="string", description="SKU", required=True),
+                    "qty": SWAIGArgument(type="integer", description="Quantity"),
+                    "options": SWAIGArgument(type="array", description="Options",
+                                             items=SWAIGArgumentItems(type="string", enum=["gift", "express"])),
+                },
+                required=["sku"],
+            ),
+        ),
+    )
+
+
+def synthetic_properties():
+    return SWAIGFunctionProperties(active=True, wait_for_fillers=True, fillers={"default": ["One moment..."]})
+
+
+def legacy_metadata(count):
+    """Function metadata as nested plain dicts, the way endpoint() stored it before signatures were compiled."""
+    functions = {}
+    for i in range(count):
+        params = synthetic_arguments()
+        meta = {"description": f"Synthetic function {i}", "function": f"function_{i}"}
+        meta.update(synthetic_properties().__dict__)
+        meta["parameters"] = {
+            "type": "object",
+            "properties": {name: build_schema(param) for name, param in params.items()},
+            "required": [name for name, param in params.items() if param.required],
+        }
+        functions[meta["function"]] = meta
+    return functions
+
+
+def register_synthetic(swaig, count, asynchronous=False):
+    """Register function_0 .. function_{count-1}, all sharing the synthetic schema."""
+    for i in range(count):
+        if asynchronous:
+            async def handler(query, limit=10, mode=None, items=None, meta_data=None, meta_data_token=None):
+                await asyncio.sleep(0)
+                return f"Found {limit} results for {query}"
+        else:
+            def handler(query, limit=10, mode=None, items=None, meta_data=None, meta_data_token=None):
+                return f"Found {limit} results for {query}"
+        handler.__name__ = f"function_{i}"
+        swaig.endpoint(
+            f"Synthetic function {i}",
+            synthetic_properties(),
+            **synthetic_arguments(),
+        )(handler)
+    return swaig
+
+
+def flask_app(count, auth=False):
+    app = Flask(__name__)
+    swaig = register_synthetic(SWAIG(app, auth=AUTH if auth else None), count)
+    return app, swaig
+
+
+def asgi_app(count, auth=False, asynchronous=True):
+    return register_synthetic(AsyncSWAIG(auth=AUTH if auth else None), count, asynchronous)
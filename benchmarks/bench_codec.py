@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""Parse/serialize cost per JSON codec for realistic SWAIG request bodies.
+
+For each installed codec and payload size (1 KB, 50 KB, 500 KB) reports the
+time to decode the request body, encode it back to bytes, and to serve a full
+function call through the Flask /swaig route.
+
+    python benchmarks/bench_codec.py
+"""
+import argparse
+import json
+import timeit
+
+from flask import Flask
+
+from signalwire_swaig import SWAIG, SWAIGArgument
+from signalwire_swaig.codec import CODECS
+
+from payloads import SIZES, function_call_payload
+
+
+def build_client(codec):
+    app = Flask(__name__)
+    swaig = SWAIG(app, codec=codec)
+
+    @swaig.endpoint("Check table availability",
+                    party_size=SWAIGArgument(type="integer", description="Guests", required=True),
+                    date=SWAIGArgument(type="string", description="Date"),
+                    time=SWAIGArgument(type="string", description="Time"))
+    def check_availability(party_size, date=None, time=None, meta_data=None, meta_data_token=None):
+        return f"A table for {party_size} is available on {date} at {time}."
+
+    return app.test_client()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=0.5, help="Approximate time budget per measurement")
+    args = parser.parse_args()
+
+    codecs = []
+    for factory in CODECS.values():
+        try:
+            codecs.append(factory())
+        except ImportError:
+            print(f"{factory.name}: not installed, skipped")
+
+    def measure(func):
+        timer = timeit.Timer(func)
+        number, elapsed = timer.autorange()
+        repeat = max(1, int(args.seconds / elapsed))
+        return min(timer.repeat(repeat=repeat, number=number)) / number * 1e6
+
+    print(f"{'codec':8} {'size':>6} {'decode us':>11} {'encode us':>11} {'request us':>11}")
+    for label, size in SIZES.items():
+        payload = function_call_payload(size)
+        body = json.dumps(payload).encode("utf-8")
+        for codec in codecs:
+            client = build_client(codec)
+            decode = measure(lambda: codec.loads(body))
+            encode = measure(lambda: codec.dumps(payload))
+            call = measure(lambda: client.post("/swaig", data=body, content_type="application/json"))
+            print(f"{codec.name:8} {label:>6} {decode:11.1f} {encode:11.1f} {call:11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""Per-call time and allocations: keyword-argument handlers vs context handlers.
+
+Dispatches the same function call through _prepare_call -> _invoke ->
+_render_result for a handler taking keyword arguments and for one registered
+with context=True, and reports microseconds per call and the peak bytes allocated while a
+call is in flight (tracemalloc).
+
+    python benchmarks/bench_context.py --number 20000
+"""
+import argparse
+import timeit
+import tracemalloc
+
+from signalwire_swaig import SWAIG, SWAIGArgument
+
+from payloads import function_call_payload
+
+ARGUMENTS = dict(
+    party_size=SWAIGArgument(type="integer", description="Guests", required=True),
+    date=SWAIGArgument(type="string", description="Date"),
+    time=SWAIGArgument(type="string", description="Time"),
+)
+
+
+def build():
+    swaig = SWAIG()
+
+    @swaig.endpoint("Check availability", **ARGUMENTS)
+    def check_availability(party_size, date=None, time=None, meta_data=None, meta_data_token=None):
+        return "available"
+
+    @swaig.endpoint("Check availability", context=True, **ARGUMENTS)
+    def check_availability_ctx(ctx):
+        return "available"
+
+    return swaig
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--number", type=int, default=20000)
+    args = parser.parse_args()
+
+    swaig = build()
+    for name in ("check_availability", "check_availability_ctx"):
+        data = function_call_payload(4096, function=name)
+
+        def dispatch():
+            ctx = swaig._prepare_call(data)
+            return swaig._render_result(ctx.function, swaig._invoke(ctx))
+
+        seconds = timeit.timeit(dispatch, number=args.number)
+        dispatch()
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        dispatch()
+        allocated = tracemalloc.get_traced_memory()[1] - before
+        tracemalloc.stop()
+        print(f"{name:24} {seconds / args.number * 1e6:7.2f} us/call  {allocated:6d} bytes peak per call")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""Cold import time of signalwire_swaig entry points, checked against a budget.
+
+Each target is imported in a fresh interpreter with ``-X importtime`` and the
+median cumulative time over --runs is compared with its budget. Targets that
+must stay light are also checked for heavy modules they must not load
+(Flask, requests). Exits with status 1 when a budget or check fails.
+
+    python benchmarks/bench_import.py
+    python benchmarks/bench_import.py --runs 9 --scale 1.5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# (statement, budget in ms, modules that must not be imported)
+TARGETS = [
+    ("import signalwire_swaig", 2, ["flask", "requests"]),
+    ("from signalwire_swaig import SWAIGResponse", 2, ["flask", "requests"]),
+    ("from signalwire_swaig import SWAIGArgument, SWAIGFunctionProperties", 20, ["flask", "requests"]),
+    ("import signalwire_swaig.swaig_cli", 10, ["flask", "requests"]),
+    ("from signalwire_swaig import AsyncSWAIG", 70, ["flask", "requests"]),
+    ("from signalwire_swaig import SWAIG", 70, ["requests"]),
+    ("import flask; from signalwire_swaig import SWAIG", 200, ["requests"]),
+]
+
+PROBE = "import sys, json; {statement}; print(json.dumps(sorted(m for m in {forbidden!r} if m in sys.modules)))"
+
+
+def measure(statement, forbidden):
+    """Return (cumulative import time in ms, forbidden modules loaded) for one fresh interpreter."""
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [os.path.dirname(os.path.dirname(os.path.abspath(__file__))), os.environ.get("PYTHONPATH")]))}
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", PROBE.format(statement=statement, forbidden=forbidden)],
+                            capture_output=True, text=True, env=env, check=True)
+    total = 0
+    started = False
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        # Top-level imports (no indentation) after the probe's own json import add up to the cost of the statement.
+        if name.startswith("  "):
+            continue
+        if started:
+            total += int(cumulative)
+        started = started or name.strip() == "json"
+    return total / 1000, json.loads(result.stdout)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply every budget, e.g. on slow CI machines")
+    args = parser.parse_args()
+
+    failed = False
+    print(f"{'ms':>8} {'budget':>8}  statement")
+    for statement, budget, forbidden in TARGETS:
+        samples = [measure(statement, forbidden) for _ in range(args.runs)]
+        elapsed = statistics.median(ms for ms, _ in samples)
+        loaded = samples[0][1]
+        limit = budget * args.scale
+        status = ""
+        if elapsed > limit:
+            status += "  OVER BUDGET"
+        if loaded:
+            status += f"  loaded {', '.join(loaded)}"
+        failed |= bool(status)
+        print(f"{elapsed:8.1f} {limit:8.1f}  {statement}{status}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""Hot-path cost of logging in function-call dispatch.
+
+Runs _prepare_call -> handler -> _render_result with a large meta_data
+payload and compares:
+
+  - logging disabled (signalwire_swaig logger above DEBUG, the default)
+  - DEBUG enabled with payload truncation, records discarded by a NullHandler
+  - no logging at all (logger calls stubbed out), the zero-overhead reference
+  - eager f-string formatting of the same payload, as the old hot path did
+
+    python benchmarks/bench_logging.py --number 20000
+"""
+import argparse
+import logging
+import timeit
+
+from signalwire_swaig import SWAIG, SWAIGArgument
+import signalwire_swaig.swaig as swaig_module
+from signalwire_swaig.instrumentation import logger
+
+
+class _Silent:
+    def debug(self, *args, **kwargs):
+        pass
+    info = warning = error = debug
+
+    def isEnabledFor(self, level):
+        return False
+
+
+def build():
+    swaig = SWAIG()
+
+    @swaig.endpoint("Look up a customer", customer_id=SWAIGArgument(type="string", description="Customer id", required=True))
+    def lookup_customer(customer_id, meta_data=None, meta_data_token=None):
+        return f"Customer {customer_id} found"
+
+    history = [{"role": "user" if i % 2 else "assistant", "content": "word " * 40} for i in range(200)]
+    data = {
+        "function": "lookup_customer",
+        "argument": {"parsed": [{"customer_id": "12345"}]},
+        "meta_data": {"account": "acme", "history": history},
+        "meta_data_token": "bench",
+    }
+    return swaig, data
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--number", type=int, default=20000)
+    args = parser.parse_args()
+
+    swaig, data = build()
+
+    def dispatch():
+        ctx = swaig._prepare_call(data)
+        return swaig._render_result(ctx.function, swaig._invoke(ctx))
+
+    def per_call(seconds):
+        return seconds / args.number * 1e6
+
+    logger.propagate = False
+    logger.addHandler(logging.NullHandler())
+
+    logger.setLevel(logging.WARNING)
+    disabled = per_call(timeit.timeit(dispatch, number=args.number))
+
+    logger.setLevel(logging.DEBUG)
+    enabled = per_call(timeit.timeit(dispatch, number=args.number // 10) * 10)
+
+    swaig_module.logger = _Silent()
+    reference = per_call(timeit.timeit(dispatch, number=args.number))
+
+    eager = per_call(timeit.timeit(lambda: f"Request data: {data}", number=args.number // 10) * 10)
+
+    print(f"payload: {len(str(data))} chars")
+    print(f"no logging (reference) : {reference:9.2f} us/call")
+    print(f"logging disabled       : {disabled:9.2f} us/call (overhead {disabled - reference:+.2f} us)")
+    print(f"DEBUG, truncated       : {enabled:9.2f} us/call")
+    print(f"eager f-string payload : {eager:9.2f} us per formatted message")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""Memory and signature build time of the compiled schema model.
+
+Registers N synthetic functions and compares the nested-dict metadata
+endpoint() used to keep (the metadata dicts plus their remove_none copies)
+with the interned, slotted CompiledFunction model, and times building an
+uncached get_signature body from each.
+
+    python benchmarks/bench_schema.py --functions 5000
+"""
+import argparse
+import time
+import tracemalloc
+
+from signalwire_swaig.codec import get_codec
+from signalwire_swaig.schema import SchemaCompiler
+from signalwire_swaig.swaig import remove_none
+
+from apps import flask_app, legacy_metadata, synthetic_arguments, synthetic_properties
+
+HOST = "http://localhost/"
+
+
+def traced(build):
+    """Return (result, KiB still allocated by build())."""
+    tracemalloc.start()
+    result = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current / 1024
+
+
+def timed(build, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        body = build()
+    return (time.perf_counter() - started) / repeat * 1000, body
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--functions", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    codec = get_codec()
+    declarations = [(f"function_{i}", f"Synthetic function {i}", synthetic_properties(), synthetic_arguments())
+                    for i in range(args.functions)]
+
+    def dict_model():
+        functions = legacy_metadata(args.functions)
+        return functions, {name: remove_none(meta) for name, meta in functions.items()}
+
+    def compiled_model():
+        compiler = SchemaCompiler(codec.dumps)
+        return compiler, {name: compiler.function(name, description, properties, params)
+                          for name, description, properties, params in declarations}
+
+    (_, signatures), dict_kib = traced(dict_model)
+    (compiler, compiled), compiled_kib = traced(compiled_model)
+
+    _, swaig = flask_app(args.functions)
+    url = f"{swaig._get_base_url(HOST)}/swaig"
+    dict_ms, dict_body = timed(lambda: codec.dumps([{**sig, "web_hook_url": url} for sig in signatures.values()]), args.repeat)
+    names = swaig._signature_names(None)
+    compiled_ms, compiled_body = timed(lambda: b"".join(swaig._iter_signatures(HOST, names)), args.repeat)
+    assert dict_body == compiled_body, "compiled signatures differ from the dict model"
+
+    print(f"functions: {args.functions}, codec: {codec.name}, body: {len(compiled_body)} bytes, "
+          f"interned sub-schemas: {len(compiler)}")
+    print(f"dict model      {dict_kib:10.0f} KiB  {dict_ms:8.2f} ms per signature body")
+    print(f"compiled model  {compiled_kib:10.0f} KiB  {compiled_ms:8.2f} ms per signature body")
+    print(f"saving          {1 - compiled_kib / dict_kib:10.1%}      {dict_ms / compiled_ms:8.1f}x faster")
+
+
+if __name__ == "__main__":
+    main()
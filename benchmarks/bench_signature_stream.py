@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""Peak memory and time-to-first-byte of an uncached get_signature response.
+
+For growing catalogs, compares building the whole signature list in memory
+(the previous implementation) with the buffered response built from
+pre-serialized entries and with stream_signatures=True, which yields the
+entries in chunks.
+
+    python benchmarks/bench_signature_stream.py --functions 1000 5000 20000
+"""
+import argparse
+import time
+import tracemalloc
+
+from apps import flask_app
+
+HOST = "http://localhost/"
+
+
+def legacy(swaig, signatures):
+    url = f"{swaig._get_base_url(HOST)}/swaig"
+    yield swaig.codec.dumps([{**signature, "web_hook_url": url} for signature in signatures])
+
+
+def buffered(swaig):
+    swaig._signature_cache.clear()
+    yield swaig._signature_body(HOST, None)[0]
+
+
+def streamed(swaig):
+    names, _ = swaig._signature_stream(HOST, None)
+    yield from swaig._iter_signatures(HOST, names)
+
+
+def measure(produce, swaig):
+    """Return (time to first chunk in ms, total ms, peak traced KiB, bytes) for one response."""
+    tracemalloc.start()
+    started = time.perf_counter()
+    first = None
+    size = 0
+    for chunk in produce(swaig):
+        if first is None:
+            first = time.perf_counter() - started
+        size += len(chunk)
+    total = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return first * 1000, total * 1000, peak / 1024, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--functions", type=int, nargs="+", default=[1000, 5000, 20000])
+    args = parser.parse_args()
+
+    print(f"{'functions':>9} {'mode':>9} {'first ms':>9} {'total ms':>9} {'peak KiB':>10} {'bytes':>10}")
+    for count in args.functions:
+        _, swaig = flask_app(count)
+        signatures = [function.to_dict() for function in swaig.functions.values()]
+        for name, produce in (("legacy", lambda swaig: legacy(swaig, signatures)), ("buffered", buffered), ("streamed", streamed)):
+            first, total, peak, size = measure(produce, swaig)
+            print(f"{count:>9} {name:>9} {first:9.2f} {total:9.2f} {peak:10.0f} {size:10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""Requests/sec for get_signature with 200 registered functions.
+
+Compares the cached signature path against the previous per-request
+copy / remove_none / jsonify implementation.
+
+    python benchmarks/bench_signatures.py --functions 200 --requests 2000
+"""
+import argparse
+import time
+
+from flask import jsonify, request
+
+from signalwire_swaig.swaig import remove_none
+
+from apps import flask_app, legacy_metadata
+
+SIGNATURE_REQUEST = {"action": "get_signature", "version": "2.0", "meta_data": {}, "meta_data_token": "bench"}
+
+
+def build_app(count):
+    app, swaig = flask_app(count)
+    functions = legacy_metadata(count)
+
+    def legacy_handler():
+        data = request.json
+        requested = data.get("functions") or list(functions.keys())
+        base_url = swaig._get_base_url()
+        signatures = []
+        for name in requested:
+            if name in functions:
+                func_info = functions[name].copy()
+                func_info["web_hook_url"] = f"{base_url}/swaig"
+                signatures.append(remove_none(func_info))
+        return jsonify(signatures)
+
+    app.route("/legacy", methods=["POST"])(legacy_handler)
+    return app
+
+
+def run(client, path, total, headers=None):
+    start = time.perf_counter()
+    for _ in range(total):
+        response = client.post(path, json=SIGNATURE_REQUEST, headers=headers)
+        assert response.status_code in (200, 304), response.status_code
+    return total / (time.perf_counter() - start), response
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--functions", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    client = build_app(args.functions).test_client()
+    legacy_rps, _ = run(client, "/legacy", args.requests)
+    cached_rps, response = run(client, "/swaig", args.requests)
+    etag_rps, _ = run(client, "/swaig", args.requests, headers={"If-None-Match": response.headers["ETag"]})
+
+    print(f"functions registered: {args.functions}, payload: {len(response.data)} bytes")
+    print(f"legacy  get_signature: {legacy_rps:10.1f} req/s")
+    print(f"cached  get_signature: {cached_rps:10.1f} req/s ({cached_rps / legacy_rps:.1f}x)")
+    print(f"etag    get_signature: {etag_rps:10.1f} req/s ({etag_rps / legacy_rps:.1f}x, 304 Not Modified)")
+
+
+if __name__ == "__main__":
+    main()
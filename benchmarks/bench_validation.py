@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""Per-call cost of the compiled argument validators.
+
+Uses the nested object/array schema from examples/app.py and reports
+microseconds per validation for valid input, input needing coercion, and
+rejected input.
+
+    python benchmarks/bench_validation.py --number 100000
+"""
+import argparse
+import timeit
+
+from signalwire_swaig import SWAIGArgument, SWAIGArgumentItems, SWAIGValidationError
+from signalwire_swaig.validation import compile_validator
+
+PARAMS = {
+    "string_example": SWAIGArgument(type="string", description="A simple string value", required=True),
+    "integer_example": SWAIGArgument(type="integer", description="An integer value", required=True),
+    "number_example": SWAIGArgument(type="number", description="A floating point number"),
+    "boolean_example": SWAIGArgument(type="boolean", description="A true/false boolean value", required=True),
+    "enum_example": SWAIGArgument(type="string", description="A constrained string", enum=["option1", "option2", "option3"]),
+    "array_example": SWAIGArgument(type="array", description="An array of strings", items=SWAIGArgumentItems(type="string")),
+    "array_of_objects": SWAIGArgument(
+        type="array",
+        description="An array of structured objects",
+        items=SWAIGArgumentItems(
+            type="object",
+            properties={
+                "name": SWAIGArgument(type="string", description="Name of the item", required=True),
+                "value": SWAIGArgument(type="integer", description="Numeric value of the item", required=True),
+                "tags": SWAIGArgument(type="array", description="Tags", items=SWAIGArgumentItems(type="string", enum=["a", "b", "c"])),
+            },
+            required=["name", "value"],
+        ),
+    ),
+}
+
+VALID = {
+    "string_example": "hello",
+    "integer_example": 42,
+    "number_example": 3.14,
+    "boolean_example": True,
+    "enum_example": "option2",
+    "array_example": ["x", "y", "z"],
+    "array_of_objects": [{"name": f"item{i}", "value": i, "tags": ["a", "b"]} for i in range(5)],
+}
+
+COERCED = dict(VALID, integer_example="42", boolean_example="true",
+               array_of_objects=[{"name": f"item{i}", "value": str(i)} for i in range(5)])
+
+INVALID = dict(VALID, array_of_objects=[{"name": "item0", "value": 0, "tags": ["a", "z"]}])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--number", type=int, default=100000)
+    args = parser.parse_args()
+
+    validate = compile_validator(PARAMS)
+    compile_us = timeit.timeit(lambda: compile_validator(PARAMS), number=1000) / 1000 * 1e6
+
+    def rejected():
+        try:
+            validate(INVALID)
+        except SWAIGValidationError:
+            pass
+
+    print(f"compile (once per endpoint): {compile_us:8.2f} us")
+    for label, call in (("valid", lambda: validate(VALID)), ("coerced", lambda: validate(COERCED)), ("rejected", rejected)):
+        seconds = timeit.timeit(call, number=args.number)
+        print(f"validate {label:9}: {seconds / args.number * 1e6:8.2f} us/call")
+
+
+if __name__ == "__main__":
+    main()
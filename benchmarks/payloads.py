@@ -0,0 +1,52 @@
+"""Realistic SignalWire AI function-call request bodies for benchmarks."""
+import json
+
+
+def _turn(index):
+    if index % 3 == 0:
+        return {"role": "user", "content": f"Can you check whether table for four is free on the {index % 28 + 1}th around seven pm?"}
+    if index % 3 == 1:
+        return {
+            "role": "assistant",
+            "content": "Let me look that up for you.",
+            "tool_calls": [{"id": f"call_{index}", "type": "function",
+                            "function": {"name": "check_availability", "arguments": json.dumps({"party_size": 4, "time": "19:00"})}}],
+        }
+    return {"role": "tool", "tool_call_id": f"call_{index - 1}", "content": "We have a table available at 7:15 pm on the patio or 7:45 pm inside."}
+
+
+def function_call_payload(target_bytes, function="check_availability", arguments=None):
+    """Build a SWAIG function-call body whose call_log history is padded to roughly target_bytes."""
+    arguments = arguments if arguments is not None else {"party_size": 4, "date": "2024-06-14", "time": "19:00"}
+    payload = {
+        "app_name": "swml app",
+        "function": function,
+        "purpose": "Check table availability for a reservation",
+        "argument_desc": {"type": "object", "properties": {"party_size": {"type": "integer"}, "date": {"type": "string"}}},
+        "argument": {"parsed": [arguments], "raw": json.dumps(arguments), "substituted": ""},
+        "call_id": "6e0f2f68-f600-4228-ab27-3dfba2b75da7",
+        "ai_session_id": "9af20f15-7051-4496-a48a-6e712f22daa5",
+        "conversation_id": "conv-22b1f4a3",
+        "caller_id_name": "+15551234567",
+        "caller_id_num": "+15551234567",
+        "channel_active": True,
+        "channel_offhook": True,
+        "channel_ready": True,
+        "content_type": "text/swaig",
+        "content_disposition": "SWAIG Function",
+        "version": "2.0",
+        "project_id": "1c8b4f6a-5c2a-4b0e-9d7e-0c7a8c1e2d3f",
+        "space_id": "a1b2c3d4-e5f6-4a5b-8c7d-9e0f1a2b3c4d",
+        "meta_data_token": "b7e3f1c9",
+        "meta_data": {"customer": {"id": "cus_123", "tier": "gold"}},
+        "SWMLVars": {"call_direction": "inbound", "from": "+15551234567", "to": "+15557654321"},
+        "call_log": [],
+    }
+    index = 0
+    while len(json.dumps(payload)) < target_bytes:
+        payload["call_log"].append(_turn(index))
+        index += 1
+    return payload
+
+
+SIZES = {"1KB": 1024, "50KB": 50 * 1024, "500KB": 500 * 1024}
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""Reproducible load benchmark for the /swaig endpoint.
+
+Builds SWAIG apps with N synthetic functions (nested SWAIGArgument schemas)
+and measures every combination of:
+
+  front end / handlers : flask-sync, asgi-sync, asgi-async
+  workload             : signatures, call-1KB, call-50KB (and call-500KB with --large)
+  auth                 : auth-off, auth-on
+
+reporting p50/p99 latency (ms) and requests/sec as JSON. Requests go through
+the WSGI/ASGI stack in-process by default; --transport http serves the apps
+on localhost (Flask via werkzeug, ASGI via uvicorn when installed) and uses
+keep-alive connections.
+
+    python benchmarks/suite.py --output bench.json
+    python benchmarks/suite.py --save-baseline benchmarks/baseline.json
+    python benchmarks/suite.py --baseline benchmarks/baseline.json --tolerance 0.15
+"""
+import argparse
+import asyncio
+import base64
+import json
+import logging
+import platform
+import socket
+import statistics
+import sys
+import threading
+import time
+
+from apps import AUTH, asgi_app, flask_app
+from payloads import function_call_payload
+
+SIGNATURE_REQUEST = {"action": "get_signature", "version": "2.0", "meta_data": {}, "meta_data_token": "bench"}
+CALL_ARGUMENTS = {"query": "pizza", "limit": 5, "mode": "fast", "items": [{"sku": "A1", "qty": 2, "options": ["gift"]}]}
+AUTH_HEADER = "Basic " + base64.b64encode(f"{AUTH[0]}:{AUTH[1]}".encode()).decode()
+
+
+class FlaskInProcess:
+    def __init__(self, app):
+        self.app = app
+
+    def run(self, body, headers, total, concurrency):
+        def worker(count, latencies):
+            client = self.app.test_client()
+            for _ in range(count):
+                started = time.perf_counter()
+                response = client.post("/swaig", data=body, headers=headers, content_type="application/json")
+                latencies.append(time.perf_counter() - started)
+                assert response.status_code == 200, response.status_code
+        return _threaded(worker, total, concurrency)
+
+    def close(self):
+        pass
+
+
+class ASGIInProcess:
+    def __init__(self, app):
+        self.app = app
+
+    async def _post(self, body, headers):
+        messages = [{"type": "http.request", "body": body, "more_body": False}]
+        status = []
+
+        async def receive():
+            return messages.pop() if messages else {"type": "http.disconnect"}
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                status.append(message["status"])
+
+        scope = {"type": "http", "method": "POST", "path": "/swaig", "scheme": "http", "server": ("127.0.0.1", 80),
+                 "headers": [(b"host", b"127.0.0.1"), (b"content-type", b"application/json")]
+                 + [(k.lower().encode(), v.encode()) for k, v in headers.items()]}
+        await self.app(scope, receive, send)
+        assert status == [200], status
+
+    def run(self, body, headers, total, concurrency):
+        async def worker(count, latencies):
+            for _ in range(count):
+                started = time.perf_counter()
+                await self._post(body, headers)
+                latencies.append(time.perf_counter() - started)
+
+        async def main():
+            latencies = []
+            started = time.perf_counter()
+            await asyncio.gather(*(worker(count, latencies) for count in _split(total, concurrency)))
+            return latencies, time.perf_counter() - started
+        return asyncio.run(main())
+
+    def close(self):
+        pass
+
+
+class HTTPServer:
+    """Serves a Flask or ASGI app on localhost and drives it with keep-alive sessions."""
+
+    def __init__(self, app, asgi):
+        import requests
+        self._requests = requests
+        self.port = _free_port()
+        if asgi:
+            import uvicorn
+            self.server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=self.port, log_level="error", lifespan="off"))
+            self.thread = threading.Thread(target=self.server.run, daemon=True)
+            self.thread.start()
+            while not self.server.started:
+                time.sleep(0.01)
+        else:
+            from werkzeug.serving import WSGIRequestHandler, make_server
+            logging.getLogger("werkzeug").setLevel(logging.ERROR)
+            WSGIRequestHandler.protocol_version = "HTTP/1.1"
+            self.server = make_server("127.0.0.1", self.port, app, threaded=True)
+            self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+            self.thread.start()
+        self.url = f"http://127.0.0.1:{self.port}/swaig"
+
+    def run(self, body, headers, total, concurrency):
+        def worker(count, latencies):
+            session = self._requests.Session()
+            for _ in range(count):
+                started = time.perf_counter()
+                response = session.post(self.url, data=body, headers={"Content-Type": "application/json", **headers})
+                latencies.append(time.perf_counter() - started)
+                assert response.status_code == 200, response.status_code
+        return _threaded(worker, total, concurrency)
+
+    def close(self):
+        if hasattr(self.server, "should_exit"):
+            self.server.should_exit = True
+        else:
+            self.server.shutdown()
+        self.thread.join(timeout=5)
+
+
+def _split(total, concurrency):
+    return [total // concurrency + (1 if i < total % concurrency else 0) for i in range(concurrency)]
+
+
+def _threaded(worker, total, concurrency):
+    latencies = []
+    threads = [threading.Thread(target=worker, args=(count, latencies)) for count in _split(total, concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, time.perf_counter() - started
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def workloads(large):
+    yield "signatures", json.dumps(SIGNATURE_REQUEST).encode()
+    sizes = [("call-1KB", 1024), ("call-50KB", 50 * 1024)] + ([("call-500KB", 500 * 1024)] if large else [])
+    for label, size in sizes:
+        yield label, json.dumps(function_call_payload(size, function="function_0", arguments=CALL_ARGUMENTS)).encode()
+
+
+def driver(frontend, functions, auth, transport):
+    if frontend == "flask-sync":
+        app, _ = flask_app(functions, auth)
+        return HTTPServer(app, asgi=False) if transport == "http" else FlaskInProcess(app)
+    app = asgi_app(functions, auth, asynchronous=frontend == "asgi-async")
+    return HTTPServer(app, asgi=True) if transport == "http" else ASGIInProcess(app)
+
+
+def run_suite(args):
+    results = {}
+    for frontend in ("flask-sync", "asgi-sync", "asgi-async"):
+        for auth in (False, True):
+            try:
+                target = driver(frontend, args.functions, auth, args.transport)
+            except ImportError as e:
+                print(f"skipping {frontend}: {e}", file=sys.stderr)
+                break
+            headers = {"Authorization": AUTH_HEADER} if auth else {}
+            try:
+                for workload, body in workloads(args.large):
+                    name = f"{frontend}/{workload}/{'auth-on' if auth else 'auth-off'}"
+                    target.run(body, headers, args.warmup, 1)
+                    latencies, elapsed = target.run(body, headers, args.requests, args.concurrency)
+                    results[name] = {
+                        "requests": len(latencies),
+                        "rps": round(len(latencies) / elapsed, 1),
+                        "p50_ms": round(statistics.median(latencies) * 1000, 3),
+                        "p99_ms": round(_percentile(latencies, 0.99) * 1000, 3),
+                    }
+                    print(f"{name:40} {results[name]['rps']:10.1f} req/s  p50 {results[name]['p50_ms']:8.3f} ms"
+                          f"  p99 {results[name]['p99_ms']:8.3f} ms", file=sys.stderr)
+            finally:
+                target.close()
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "transport": args.transport,
+            "functions": args.functions,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        },
+        "results": results,
+    }
+
+
+def compare(report, baseline, tolerance):
+    """Print the change against a baseline; return the scenarios that regressed beyond tolerance."""
+    regressions = []
+    for name, current in report["results"].items():
+        previous = baseline.get("results", {}).get(name)
+        if previous is None:
+            continue
+        rps_change = current["rps"] / previous["rps"] - 1 if previous["rps"] else 0
+        p99_change = current["p99_ms"] / previous["p99_ms"] - 1 if previous["p99_ms"] else 0
+        regressed = rps_change < -tolerance or p99_change > tolerance
+        print(f"{name:40} rps {rps_change:+7.1%}  p99 {p99_change:+7.1%}{'  REGRESSION' if regressed else ''}", file=sys.stderr)
+        if regressed:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--functions", type=int, default=50, help="Synthetic functions to register")
+    parser.add_argument("--requests", type=int, default=500, help="Measured requests per scenario")
+    parser.add_argument("--warmup", type=int, default=50, help="Unmeasured requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=1, help="Concurrent clients per scenario")
+    parser.add_argument("--transport", choices=("inprocess", "http"), default="inprocess")
+    parser.add_argument("--large", action="store_true", help="Include the 500 KB fullrequest workload")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    parser.add_argument("--save-baseline", metavar="FILE", help="Also write the report as a baseline")
+    parser.add_argument("--baseline", metavar="FILE", help="Compare against a stored baseline")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Allowed relative regression (default 0.10)")
+    args = parser.parse_args()
+
+    report = run_suite(args)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            f.write(text + "\n")
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} scenario(s) regressed beyond {args.tolerance:.0%}", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
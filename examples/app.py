@@ -1,6 +1,10 @@
-from signalwire_swaig.swaig import SWAIG, SWAIGArgument, SWAIGArgumentItems, SWAIGFunctionProperties,
+from signalwire_swaig.swaig import SWAIG, SWAIGArgument, SWAIGArgumentItems, SWAIGFunctionProperties
 from signalwire_swaig.response import SWAIGResponse
 from flask import Flask
+import logging
+import os
+
+logging.basicConfig(level=os.getenv('LOG_LEVEL', 'DEBUG').upper())
 
 app = Flask(__name__)
 swaig = SWAIG(app)
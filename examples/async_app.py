@@ -0,0 +1,22 @@
+import asyncio
+from signalwire_swaig import AsyncSWAIG, SWAIGArgument, SWAIGResponse
+
+# Serve with any ASGI server, e.g. `uvicorn examples.async_app:swaig --port 5002`
+swaig = AsyncSWAIG(auth=("username", "password"))
+
+@swaig.endpoint(
+    "Search for a movie by title",
+    query=SWAIGArgument(type="string", description="The movie title to search for", required=True)
+)
+async def search_movie(query, meta_data=None, meta_data_token=None):
+    # Stand-in for a slow downstream API; the event loop keeps serving other calls meanwhile.
+    await asyncio.sleep(1)
+    return SWAIGResponse(f"I found a movie called {query}.")
+
+@swaig.endpoint(
+    "Get the current time in a city",
+    city=SWAIGArgument(type="string", description="City name", required=True)
+)
+def get_time(city, meta_data=None, meta_data_token=None):
+    # Sync handlers run in the AsyncSWAIG thread pool.
+    return f"It is noon in {city}."
@@ -1,4 +1,51 @@
-from .swaig import SWAIG, SWAIGArgument, SWAIGArgumentItems, SWAIGFunctionProperties
-from .response import SWAIGResponse
+from typing import TYPE_CHECKING
+import importlib
 
-__all__ = ['SWAIG', 'SWAIGArgument', 'SWAIGArgumentItems', 'SWAIGFunctionProperties', 'SWAIGResponse']
\ No newline at end of file
+# Public names and the submodule defining each one. They are imported on first
+# access, so importing SWAIGResponse or the schema dataclasses does not load Flask.
+_EXPORTS = {
+    'SWAIG': '.swaig',
+    'AsyncSWAIG': '.asgi',
+    'AnyAuth': '.auth',
+    'AuthVerifier': '.auth',
+    'BasicAuth': '.auth',
+    'HMACAuth': '.auth',
+    'SWAIGCache': '.cache',
+    'SWAIGRequestContext': '.context',
+    'current_context': '.context',
+    'SWAIGError': '.errors',
+    'SWAIGValidationError': '.errors',
+    'SWAIGResponse': '.response',
+    'SignatureSnapshotError': '.snapshot',
+    'SWAIGArgument': '.schema',
+    'SWAIGArgumentItems': '.schema',
+    'SWAIGFunctionProperties': '.schema',
+    'MemoryMetaDataStore': '.store',
+    'MetaDataStore': '.store',
+    'RedisMetaDataStore': '.store',
+}
+
+if TYPE_CHECKING:
+    from .swaig import SWAIG
+    from .asgi import AsyncSWAIG
+    from .auth import AnyAuth, AuthVerifier, BasicAuth, HMACAuth
+    from .cache import SWAIGCache
+    from .context import SWAIGRequestContext, current_context
+    from .errors import SWAIGError, SWAIGValidationError
+    from .response import SWAIGResponse
+    from .snapshot import SignatureSnapshotError
+    from .schema import SWAIGArgument, SWAIGArgumentItems, SWAIGFunctionProperties
+    from .store import MemoryMetaDataStore, MetaDataStore, RedisMetaDataStore
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
+__all__ = ['SWAIG', 'AnyAuth', 'AsyncSWAIG', 'AuthVerifier', 'BasicAuth', 'HMACAuth', 'MemoryMetaDataStore', 'MetaDataStore', 'RedisMetaDataStore', 'SWAIGArgument', 'SWAIGArgumentItems', 'SWAIGCache', 'SWAIGError', 'SWAIGFunctionProperties', 'SWAIGRequestContext', 'SWAIGResponse', 'SWAIGValidationError', 'SignatureSnapshotError', 'current_context']
@@ -0,0 +1,170 @@
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+import asyncio
+import threading
+import time
+
+# (calls per second, burst)
+RateLimit = Tuple[float, float]
+
+# Spoken when a call is shed, so the AI tells the caller instead of going silent.
+DEFAULT_RETRY_RESPONSE = "I'm handling a lot of requests right now. Please try again in a moment."
+# Per-conversation buckets kept; the least recently used are dropped beyond this.
+DEFAULT_MAX_BUCKETS = 10000
+
+class TokenBucket:
+    """Allows ``rate`` calls per second on average and bursts of up to ``burst`` calls."""
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def take(self, now: float) -> bool:
+        self.tokens = min(self.burst, self.tokens + max(0.0, now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+class AdmissionController:
+    """Decides whether a function call runs now, waits for a slot or is shed.
+
+    - ``per_token`` limits each conversation (meta_data_token).
+    - ``per_function`` limits each function; ``endpoint(rate_limit=...)`` and
+      ``limit_function`` override it for one function.
+    - ``max_concurrency`` caps calls running at once. Up to ``max_queue`` more
+      wait at most ``queue_timeout`` seconds for a slot.
+
+    Shed calls are answered with ``retry_response`` and counted in
+    ``swaig_shed_total`` by reason: ``token_rate``, ``function_rate``,
+    ``queue_full`` or ``queue_timeout``.
+    """
+
+    def __init__(self, per_token: Optional[RateLimit] = None, per_function: Optional[RateLimit] = None,
+                 max_concurrency: Optional[int] = None, max_queue: int = 0, queue_timeout: float = 1.0,
+                 retry_response: Any = DEFAULT_RETRY_RESPONSE, max_buckets: int = DEFAULT_MAX_BUCKETS, metrics=None):
+        self.per_token = per_token
+        self.per_function = per_function
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_response = retry_response
+        self.max_buckets = max_buckets
+        self._function_limits: Dict[str, RateLimit] = {}
+        self._token_buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self._function_buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_concurrency) if max_concurrency else None
+        self._async_slots: Optional[asyncio.Semaphore] = None
+        self._waiting = 0
+        self._metrics = None
+        if metrics is not None:
+            self.bind_metrics(metrics)
+
+    def bind_metrics(self, metrics):
+        """Export shed calls by reason and function, and calls waiting for a slot."""
+        from .metrics import Counter, Gauge
+        self._metrics = (
+            metrics.register(Counter("swaig_shed_total", "Function calls shed by admission control.", ["reason", "function"])),
+            metrics.register(Gauge("swaig_admission_waiting", "Function calls waiting for a concurrency slot.")),
+        )
+
+    def limit_function(self, function: str, limit: Optional[RateLimit]):
+        """Set (or, with None, remove) the rate limit of one function."""
+        with self._lock:
+            if limit is None:
+                self._function_limits.pop(function, None)
+            else:
+                self._function_limits[function] = limit
+            self._function_buckets.pop(function, None)
+
+    def shed(self, reason: str, function: Optional[str]):
+        if self._metrics:
+            self._metrics[0].inc(reason, function or "")
+
+    def check(self, function: Optional[str], token: Optional[str]) -> Optional[str]:
+        """Take a token from the call's buckets; returns the shed reason, or None to admit.
+
+        ``function`` is None for calls to unknown functions, which are not limited.
+        """
+        if self.per_token is None and self.per_function is None and not self._function_limits:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            if self.per_token is not None and isinstance(token, str):
+                bucket = self._token_buckets.get(token)
+                if bucket is None:
+                    bucket = self._token_buckets[token] = TokenBucket(*self.per_token)
+                    if len(self._token_buckets) > self.max_buckets:
+                        self._token_buckets.popitem(last=False)
+                else:
+                    self._token_buckets.move_to_end(token)
+                if not bucket.take(now):
+                    return "token_rate"
+            if function is not None:
+                bucket = self._function_buckets.get(function)
+                if bucket is None:
+                    limit = self._function_limits.get(function, self.per_function)
+                    if limit is None:
+                        return None
+                    bucket = self._function_buckets[function] = TokenBucket(*limit)
+                if not bucket.take(now):
+                    return "function_rate"
+        return None
+
+    def _wait_started(self) -> bool:
+        with self._lock:
+            if self._waiting >= self.max_queue:
+                return False
+            self._waiting += 1
+        if self._metrics:
+            self._metrics[1].inc()
+        return True
+
+    def _wait_finished(self):
+        with self._lock:
+            self._waiting -= 1
+        if self._metrics:
+            self._metrics[1].dec()
+
+    def acquire(self) -> Optional[str]:
+        """Take a concurrency slot, waiting in the queue if allowed; returns the shed reason or None."""
+        if self._slots is None or self._slots.acquire(blocking=False):
+            return None
+        if not self._wait_started():
+            return "queue_full"
+        try:
+            return None if self._slots.acquire(timeout=self.queue_timeout) else "queue_timeout"
+        finally:
+            self._wait_finished()
+
+    def release(self):
+        if self._slots is not None:
+            self._slots.release()
+
+    async def acquire_async(self) -> Optional[str]:
+        """acquire() for the event loop of an AsyncSWAIG."""
+        if self.max_concurrency is None:
+            return None
+        if self._async_slots is None:
+            self._async_slots = asyncio.Semaphore(self.max_concurrency)
+        if not self._async_slots.locked():
+            await self._async_slots.acquire()
+            return None
+        if not self._wait_started():
+            return "queue_full"
+        try:
+            await asyncio.wait_for(self._async_slots.acquire(), self.queue_timeout)
+            return None
+        except asyncio.TimeoutError:
+            return "queue_timeout"
+        finally:
+            self._wait_finished()
+
+    def release_async(self):
+        if self._async_slots is not None:
+            self._async_slots.release()
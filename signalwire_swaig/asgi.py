@@ -0,0 +1,339 @@
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
+import contextvars
+import functools
+import inspect
+import time
+from urllib.parse import parse_qs
+from .auth import AuthSpec
+from .context import _current_context
+from .instrumentation import logger
+from .tracing import _current_trace, current_trace
+from .swaig import SWAIG
+
+class _HeaderView:
+    """Read-only str view of raw ASGI headers for AuthVerifier lookups by lower-case name."""
+    __slots__ = ("_headers",)
+
+    def __init__(self, headers: Dict[bytes, bytes]):
+        self._headers = headers
+
+    def get(self, name: str, default: Optional[str] = None) -> Optional[str]:
+        value = self._headers.get(name.encode("latin-1"))
+        return value.decode("latin-1") if value is not None else default
+
+class AsyncSWAIG(SWAIG):
+    """SWAIG served as an ASGI application.
+
+    Handlers registered through ``endpoint()`` may be ``async def`` coroutines,
+    which run on the event loop, or plain functions, which run in the bounded
+    SWAIG thread pool (``max_workers``) so they never block other in-flight calls.
+
+        swaig = AsyncSWAIG(auth=("user", "pass"))
+
+        @swaig.endpoint("Search movies", query=SWAIGArgument("string", "Title", required=True))
+        async def search_movie(query, meta_data=None, meta_data_token=None):
+            ...
+
+        # uvicorn myapp:swaig
+
+    Keyword options other than ``path`` are passed to SWAIG.
+    """
+
+    def __init__(self, auth: AuthSpec = None, path: str = "/swaig", **options):
+        super().__init__(auth=auth, **options)
+        self.path = path
+        self._hook_path = path
+        self._background = set()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            return await self._lifespan(receive, send)
+        if scope["type"] != "http":
+            raise RuntimeError(f"Unsupported ASGI scope type: {scope['type']}")
+        if self.metrics_path and scope["path"] == self.metrics_path and scope["method"] == "GET":
+            return await self._send(send, 200, self.metrics.render().encode("utf-8"), content_type=self.metrics.content_type.encode("ascii"))
+        router = self if scope["path"] == self.path else self._mounts.get(scope["path"])
+        if router is None:
+            return await self._send(send, 404, b'{"error": "Not Found"}')
+        if scope["method"] != "POST":
+            return await self._send(send, 405, b'{"error": "Method Not Allowed"}', [(b"allow", b"POST")])
+
+        headers = dict(scope["headers"])
+        started = time.perf_counter()
+        action = "invalid"
+        self.metrics.in_flight.inc()
+        trace = self._start_trace()
+        token = _current_trace.set(trace) if trace.enabled else None
+        try:
+            limit = self.max_body_size
+            declared = headers.get(b"content-length", b"")
+            if limit is not None and declared.isdigit() and int(declared) > limit:
+                self.metrics.errors.inc("too_large")
+                return await self._send(send, 413, b'{"error": "Request body too large"}', [(b"connection", b"close")])
+            with trace.stage("read"):
+                body = await self._read_body(receive, limit)
+            if body is None:
+                self.metrics.errors.inc("too_large")
+                return await self._send(send, 413, b'{"error": "Request body too large"}', [(b"connection", b"close")])
+            selector = None
+            if router.registries:
+                selector = parse_qs(scope.get("query_string", b"").decode("latin-1")).get(self.registry_field, [None])[0]
+            checked = None
+            early = router._early_auth_owner(selector)
+            if early is not None and early.auth is not None:
+                with trace.stage("auth"):
+                    authorized = early.auth.verify(_HeaderView(headers), body)
+                if not authorized:
+                    return await self._unauthorized_async(send, early)
+                checked = early.auth
+            try:
+                with trace.stage("parse"):
+                    data = self._decode(body)
+            except ValueError:
+                self.metrics.errors.inc("bad_request")
+                return await self._send(send, 400, b'{"error": "Invalid JSON body"}')
+            if not isinstance(data, dict):
+                self.metrics.errors.inc("bad_request")
+                return await self._send(send, 400, b'{"error": "Request body must be a JSON object"}')
+
+            target = router
+            if router.registries:
+                target = router._select_registry(data, selector)
+                owner = router._auth_owner(target or router)
+                if owner.auth is not None and owner.auth is not checked:
+                    with trace.stage("auth"):
+                        authorized = owner.auth.verify(_HeaderView(headers), body)
+                    if not authorized:
+                        return await self._unauthorized_async(send, owner)
+                if target is None:
+                    self.metrics.errors.inc("not_found")
+                    return await self._send(send, 404, b'{"error": "Unknown registry"}')
+
+            if self.log_policy.enabled():
+                logger.debug("Request data: %s", self.log_policy.render(data))
+            action = self._action(data)
+            trace.tag("action", action)
+            if action == "get_signature":
+                logger.debug("Action is get_signature")
+                host_url = target._signature_host(self._host_url(scope, headers))
+                with trace.stage("signatures"):
+                    if self.stream_signatures:
+                        names, etag = target._signature_stream(host_url, data.get("functions"))
+                    else:
+                        body, etag = target._signature_body(host_url, data.get("functions"))
+                etag_header = f'"{etag}"'.encode("ascii")
+                if etag_header in headers.get(b"if-none-match", b""):
+                    return await self._send(send, 304, b"", [(b"etag", etag_header)] + self._timing_header(trace))
+                if self.stream_signatures:
+                    return await self._send_stream(send, target._iter_signatures(host_url, names),
+                                                   [(b"etag", etag_header)] + self._timing_header(trace))
+                return await self._send(send, 200, body, [(b"etag", etag_header)] + self._timing_header(trace))
+            if action == "batch":
+                logger.debug("Action is batch")
+                result = await target.call_batch(data)
+            else:
+                logger.debug("Action is function call")
+                result = await target.call_function(data)
+            with trace.stage("serialize"):
+                payload = self.codec.dumps(result)
+            await self._send(send, 200, payload, self._timing_header(trace))
+        finally:
+            if token is not None:
+                trace.finish()
+                _current_trace.reset(token)
+            self.metrics.in_flight.dec()
+            self.metrics.requests.inc(action)
+            self.metrics.request_latency.observe(action, value=time.perf_counter() - started)
+
+    @staticmethod
+    def _timing_header(trace) -> List[Tuple[bytes, bytes]]:
+        if not trace.enabled:
+            return []
+        trace.finish()
+        return [(b"server-timing", trace.server_timing().encode("latin-1"))]
+
+    async def call_function(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Dispatch a SWAIG function call, awaiting async handlers and offloading sync ones."""
+        logger.debug("Handling function call")
+        try:
+            return await self._dispatch_async(data)
+        except Exception as e:
+            return self._render_exception(data.get('function'), e)
+
+    async def call_batch(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Run the calls of a batch request concurrently, at most batch_concurrency at a time."""
+        calls = self._batch_calls(data)
+        if isinstance(calls, dict):
+            return calls
+        limit = asyncio.Semaphore(self.batch_concurrency)
+
+        async def run(call):
+            if not isinstance(call, dict):
+                return self._batch_error(call, "Invalid call format. It should be an object.")
+            # gather runs each call in its own task, so the call trace stays with it.
+            trace = current_trace().call()
+            if trace.enabled:
+                _current_trace.set(trace)
+            async with limit:
+                try:
+                    body = await asyncio.wait_for(self._dispatch_async(call), self.batch_timeout)
+                except asyncio.TimeoutError:
+                    self.metrics.errors.inc("timeout")
+                    return self._batch_error(call, "Timed out")
+                except Exception as e:
+                    return self._batch_error(call, self._render_exception(call.get("function"), e)["response"])
+                finally:
+                    trace.finish()
+            return {"function": call.get("function"), **body}
+
+        return {"results": list(await asyncio.gather(*(run(call) for call in calls)))}
+
+    async def _dispatch_async(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        function, token = self._admission_key(data)
+        reason = self.admission.check(function, token)
+        if reason is None:
+            reason = await self.admission.acquire_async()
+            if reason is None:
+                try:
+                    return await self._run_call_async(data)
+                finally:
+                    self.admission.release_async()
+        return self._shed(reason, function)
+
+    async def _run_call_async(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        trace = current_trace()
+        with trace.stage("prepare"):
+            ctx = self._prepare_call(data)
+        trace.tag("function", ctx.function)
+        trace.tag("meta_data_token", ctx.meta_data_token)
+        token = _current_context.set(ctx)
+        started = self._call_started(ctx)
+        try:
+            body = None
+            for hook in self._before_call:
+                result = hook(ctx)
+                if inspect.isawaitable(result):
+                    result = await result
+                if result is not None:
+                    body = self._render_result(ctx.function, result)
+                    break
+            if body is None:
+                with trace.stage("handler"):
+                    body = await self._call_handler_async(ctx)
+            for hook in self._after_call:
+                replaced = hook(ctx, body)
+                if inspect.isawaitable(replaced):
+                    replaced = await replaced
+                if replaced is not None:
+                    body = replaced
+            return body
+        finally:
+            self._call_finished(ctx, started)
+            _current_context.reset(token)
+
+    async def _call_handler_async(self, ctx) -> Dict[str, Any]:
+        timeout = self._timeout_for(ctx.function)
+        if timeout is None:
+            return await self._complete_async(ctx)
+        task = asyncio.ensure_future(self._complete_async(ctx))
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), timeout)
+        except asyncio.TimeoutError:
+            if task.done():
+                raise
+            if self.cancel_on_timeout:
+                task.cancel()
+            else:
+                # Let the late call finish (and persist its state) in the background.
+                self._background.add(task)
+                task.add_done_callback(self._finish_background)
+            return self._timeout_body(ctx)
+
+    async def _complete_async(self, ctx) -> Dict[str, Any]:
+        cache = self._caches.get(ctx.function)
+        if cache is not None:
+            body = await cache.acall(cache.make_key(ctx), lambda: self._execute_async(ctx))
+        else:
+            body = await self._execute_async(ctx)
+        if ctx._state is not None and ctx._state.changed:
+            body = await asyncio.get_running_loop().run_in_executor(self.executor, self._apply_state, ctx, body)
+        return body
+
+    def _finish_background(self, task):
+        self._background.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning("Late call failed after timing out: %s", task.exception())
+
+    async def _execute_async(self, ctx) -> Dict[str, Any]:
+        if inspect.iscoroutinefunction(self.function_objects[ctx.function]):
+            result = await self._invoke(ctx)
+        else:
+            call = functools.partial(contextvars.copy_context().run, self._invoke, ctx)
+            result = await asyncio.get_running_loop().run_in_executor(self.executor, call)
+            if inspect.iscoroutine(result):
+                result = await result
+        return self._render_result(ctx.function, result)
+
+    def _submit_deferred(self, func, args, kwargs, block: bool = True):
+        # Results are rendered on the event loop, which must not wait for queue space.
+        super()._submit_deferred(func, args, kwargs, block=False)
+
+    async def _unauthorized_async(self, send, registry: "AsyncSWAIG"):
+        self.metrics.errors.inc("unauthorized")
+        challenge = [(b"www-authenticate", registry.auth.challenge.encode("latin-1"))] if registry.auth.challenge else []
+        return await self._send(send, 401, b'{"error": "Unauthorized"}', challenge)
+
+    @staticmethod
+    def _host_url(scope, headers: Dict[bytes, bytes]) -> str:
+        host = headers.get(b"host")
+        if host is None:
+            server_host, server_port = scope.get("server") or ("localhost", None)
+            host = f"{server_host}:{server_port}" if server_port else server_host
+        else:
+            host = host.decode("latin-1")
+        return f"{scope.get('scheme', 'http')}://{host}/"
+
+    @staticmethod
+    async def _read_body(receive, limit: Optional[int] = None) -> Optional[bytes]:
+        """Read the request body; None once it grows past ``limit`` bytes."""
+        chunks = []
+        size = 0
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                break
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            if limit is not None and size > limit:
+                return None
+            chunks.append(chunk)
+            if not message.get("more_body", False):
+                break
+        return b"".join(chunks)
+
+    @staticmethod
+    async def _send(send, status: int, body: bytes, headers: Optional[List[Tuple[bytes, bytes]]] = None,
+                    content_type: bytes = b"application/json"):
+        response_headers = [(b"content-type", content_type), (b"content-length", str(len(body)).encode("ascii"))]
+        await send({"type": "http.response.start", "status": status, "headers": response_headers + (headers or [])})
+        await send({"type": "http.response.body", "body": body})
+
+    @staticmethod
+    async def _send_stream(send, chunks, headers: Optional[List[Tuple[bytes, bytes]]] = None):
+        await send({"type": "http.response.start", "status": 200,
+                    "headers": [(b"content-type", b"application/json")] + (headers or [])})
+        for chunk in chunks:
+            await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await self.http.aclose()
+                self.shutdown()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
@@ -0,0 +1,117 @@
+from abc import ABC, abstractmethod
+from typing import Iterable, Mapping, Optional, Sequence, Tuple, Union
+import base64
+import hmac
+import time
+
+class AuthVerifier(ABC):
+    """Decides whether a request may reach the SWAIG route.
+
+    ``verify`` receives the request headers (looked up by lower-case name) and
+    the raw body, and must not raise. ``challenge`` is sent back as the
+    WWW-Authenticate header of the 401 response.
+    """
+    challenge: Optional[str] = None
+    # (username, password) embedded in web_hook_url so SignalWire calls back with credentials.
+    credentials: Optional[Tuple[str, str]] = None
+
+    @abstractmethod
+    def verify(self, headers: Mapping[str, str], body: bytes) -> bool:
+        ...
+
+def _basic_header(username: str, password: str) -> bytes:
+    return b"Basic " + base64.b64encode(f"{username}:{password}".encode("utf-8"))
+
+class BasicAuth(AuthVerifier):
+    """HTTP Basic auth against one or more credential sets.
+
+    The expected Authorization headers are computed once and compared in
+    constant time. Pass several sets to rotate credentials: the first one is
+    advertised in web_hook_url, the others stay accepted until removed.
+
+        swaig.set_auth(BasicAuth(("user", "new-pass"), ("user", "old-pass")))
+    """
+    challenge = 'Basic realm="Authentication Required"'
+
+    def __init__(self, *credentials: Tuple[str, str]):
+        if not credentials:
+            raise ValueError("BasicAuth needs at least one (username, password) pair")
+        self.credentials = tuple(credentials[0])
+        self._expected = tuple(_basic_header(username, password) for username, password in credentials)
+
+    def verify(self, headers: Mapping[str, str], body: bytes) -> bool:
+        supplied = headers.get("authorization")
+        if not supplied:
+            return False
+        supplied = supplied.encode("latin-1", "replace")
+        matched = False
+        # Check every set so the time taken does not reveal which one matched.
+        for expected in self._expected:
+            matched |= hmac.compare_digest(supplied, expected)
+        return matched
+
+class HMACAuth(AuthVerifier):
+    """Requests signed with a shared secret.
+
+    The client sends ``hex(HMAC(secret, timestamp + "." + body))`` in
+    ``signature_header`` and the Unix time in ``timestamp_header``; requests
+    older or newer than ``max_skew`` seconds are rejected. With
+    ``timestamp_header=None`` the body alone is signed. Several secrets may be
+    given for rotation.
+    """
+
+    def __init__(self, *secrets: Union[str, bytes], signature_header: str = "X-Signature",
+                 timestamp_header: Optional[str] = "X-Timestamp", max_skew: float = 300, algorithm: str = "sha256"):
+        if not secrets:
+            raise ValueError("HMACAuth needs at least one secret")
+        self.secrets = tuple(secret.encode("utf-8") if isinstance(secret, str) else secret for secret in secrets)
+        self.signature_header = signature_header.lower()
+        self.timestamp_header = timestamp_header.lower() if timestamp_header else None
+        self.max_skew = max_skew
+        self.algorithm = algorithm
+
+    def sign(self, body: bytes, timestamp: Optional[str] = None, secret: Optional[bytes] = None) -> str:
+        message = f"{timestamp}.".encode("ascii") + body if timestamp is not None else body
+        return hmac.new(secret or self.secrets[0], message, self.algorithm).hexdigest()
+
+    def verify(self, headers: Mapping[str, str], body: bytes) -> bool:
+        signature = headers.get(self.signature_header)
+        if not signature:
+            return False
+        timestamp = None
+        if self.timestamp_header:
+            timestamp = headers.get(self.timestamp_header)
+            try:
+                if abs(time.time() - float(timestamp)) > self.max_skew:
+                    return False
+            except (TypeError, ValueError):
+                return False
+        supplied = signature.encode("latin-1", "replace")
+        matched = False
+        for secret in self.secrets:
+            matched |= hmac.compare_digest(supplied, self.sign(body, timestamp, secret).encode("ascii"))
+        return matched
+
+class AnyAuth(AuthVerifier):
+    """Accepts a request when any of the given verifiers does."""
+
+    def __init__(self, *verifiers: AuthVerifier):
+        self.verifiers = verifiers
+        self.challenge = next((v.challenge for v in verifiers if v.challenge), None)
+        self.credentials = next((v.credentials for v in verifiers if v.credentials), None)
+
+    def verify(self, headers: Mapping[str, str], body: bytes) -> bool:
+        return any(verifier.verify(headers, body) for verifier in self.verifiers)
+
+AuthSpec = Union[None, AuthVerifier, Tuple[str, str], Sequence[Tuple[str, str]]]
+
+def make_verifier(auth: AuthSpec) -> Optional[AuthVerifier]:
+    """Normalize the ``auth`` option: a verifier, a (username, password) pair or a list of pairs."""
+    if isinstance(auth, AuthVerifier):
+        return auth
+    if not auth:
+        return None
+    if isinstance(auth, tuple) and len(auth) == 2 and all(isinstance(part, str) for part in auth):
+        return BasicAuth(auth)
+    pairs: Iterable[Tuple[str, str]] = auth
+    return BasicAuth(*pairs)
@@ -0,0 +1,113 @@
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+import asyncio
+import hashlib
+import json
+import threading
+import time
+
+def canonical_key(args: Any, meta_data_token: Optional[str] = None) -> bytes:
+    """Hash parsed arguments independent of key order; optionally scoped to a conversation."""
+    canonical = json.dumps(args, sort_keys=True, separators=(",", ":"), default=str)
+    if meta_data_token is not None:
+        canonical = f"{meta_data_token}\0{canonical}"
+    return hashlib.blake2b(canonical.encode("utf-8"), digest_size=16).digest()
+
+class SWAIGCache:
+    """Memoizes a function's SWAIG response on its parsed arguments.
+
+        @swaig.endpoint("Weather", cache=SWAIGCache(ttl=60), city=SWAIGArgument("string", "City"))
+        def get_weather(city, meta_data=None, meta_data_token=None): ...
+
+    ``per_token`` scopes entries to the call's ``meta_data_token``; ``key``
+    replaces the default argument hash with ``key(ctx)`` for a
+    SWAIGRequestContext. Concurrent identical calls are coalesced so the
+    handler runs once and every caller gets its result. Failed calls are not
+    cached.
+    """
+
+    def __init__(self, ttl: Optional[float] = 60, max_entries: int = 10000, key: Optional[Callable[[Any], Hashable]] = None,
+                 per_token: bool = False):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.key = key
+        self.per_token = per_token
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._entries: "OrderedDict[Hashable, tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._inflight: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+
+    def make_key(self, ctx) -> Hashable:
+        if self.key is not None:
+            return self.key(ctx)
+        return canonical_key(dict(ctx.args), ctx.meta_data_token if self.per_token else None)
+
+    def _lookup(self, key: Hashable):
+        """Return (cached body, None), (None, future to wait on) or (None, None) when the caller must compute."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires, body = entry
+                if not expires or expires >= time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return body, None
+                del self._entries[key]
+            future = self._inflight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return None, future
+            self.misses += 1
+            self._inflight[key] = Future()
+            return None, None
+
+    def _store(self, key: Hashable, body: Optional[Dict[str, Any]], error: Optional[BaseException] = None):
+        with self._lock:
+            future = self._inflight.pop(key)
+            if error is None:
+                self._entries[key] = (time.monotonic() + self.ttl if self.ttl else 0, body)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        if error is None:
+            future.set_result(body)
+        else:
+            future.set_exception(error)
+
+    def call(self, key: Hashable, compute: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        body, waiting = self._lookup(key)
+        if body is not None:
+            return body
+        if waiting is not None:
+            return waiting.result()
+        try:
+            body = compute()
+        except BaseException as e:
+            self._store(key, None, e)
+            raise
+        self._store(key, body)
+        return body
+
+    async def acall(self, key: Hashable, compute: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        body, waiting = self._lookup(key)
+        if body is not None:
+            return body
+        if waiting is not None:
+            return await asyncio.wrap_future(waiting)
+        try:
+            body = await compute()
+        except BaseException as e:
+            self._store(key, None, e)
+            raise
+        self._store(key, body)
+        return body
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "coalesced": self.coalesced, "entries": len(self._entries)}
@@ -0,0 +1,80 @@
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any, Optional
+from uuid import UUID
+import dataclasses
+import json
+
+def _default(obj: Any) -> Any:
+    """Fallback for values the JSON encoders do not handle natively."""
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return dataclasses.asdict(obj)
+    if isinstance(obj, (datetime, date, time)):
+        return obj.isoformat()
+    if isinstance(obj, (Decimal, UUID)):
+        return str(obj)
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    if hasattr(obj, "__html__"):
+        return str(obj.__html__())
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+class JSONCodec:
+    """Parses request bodies and serializes response bodies.
+
+    ``loads`` accepts bytes and raises ValueError on malformed input; ``dumps``
+    returns UTF-8 encoded bytes ready to be written to the response.
+    """
+    name = "json"
+
+    def loads(self, data: bytes) -> Any:
+        return json.loads(data)
+
+    def dumps(self, obj: Any) -> bytes:
+        return json.dumps(obj, default=_default, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+class OrjsonCodec(JSONCodec):
+    name = "orjson"
+
+    def __init__(self):
+        import orjson
+        self._loads = orjson.loads
+        self._dumps = orjson.dumps
+        self._option = orjson.OPT_NON_STR_KEYS
+
+    def loads(self, data: bytes) -> Any:
+        return self._loads(data)
+
+    def dumps(self, obj: Any) -> bytes:
+        return self._dumps(obj, default=_default, option=self._option)
+
+class MsgspecCodec(JSONCodec):
+    name = "msgspec"
+
+    def __init__(self):
+        import msgspec
+        self._decode = msgspec.json.Decoder().decode
+        self._encode = msgspec.json.Encoder(enc_hook=_default).encode
+        self._decode_error = msgspec.DecodeError
+
+    def loads(self, data: bytes) -> Any:
+        try:
+            return self._decode(data)
+        except self._decode_error as e:
+            raise ValueError(str(e)) from e
+
+    def dumps(self, obj: Any) -> bytes:
+        return self._encode(obj)
+
+CODECS = {codec.name: codec for codec in (OrjsonCodec, MsgspecCodec, JSONCodec)}
+
+def get_codec(name: Optional[str] = None) -> JSONCodec:
+    """Return the named codec, or the fastest installed one (orjson, then msgspec, then stdlib json)."""
+    if name is not None:
+        return CODECS[name]()
+    for codec in CODECS.values():
+        try:
+            return codec()
+        except ImportError:
+            continue
+    return JSONCodec()
@@ -0,0 +1,66 @@
+from contextvars import ContextVar
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any, Callable, Dict, Mapping, Optional, Union
+from .store import MetaDataStore, SWAIGState
+
+if TYPE_CHECKING:
+    from .outbound import HTTPClient
+
+class SWAIGRequestContext:
+    """Read-only view of a single SWAIG function call.
+
+    Handlers registered with ``endpoint(..., context=True)`` receive this as
+    their only argument instead of keyword arguments. ``args`` and
+    ``meta_data`` are read-only views over the parsed request (no copies are
+    made), and ``request`` is the full request body, resolved on first access.
+    ``state`` is the mutable per-conversation state kept in the SWAIG
+    meta_data store, and ``http`` the SWAIG's shared outbound HTTPClient.
+    """
+    __slots__ = ("function", "args", "meta_data", "meta_data_token", "http", "_request", "_store", "_state")
+
+    def __init__(self, function: str, args: Dict[str, Any], meta_data: Dict[str, Any], meta_data_token: Optional[str],
+                 request: Union[Dict[str, Any], Callable[[], Dict[str, Any]]], store: Optional[MetaDataStore] = None,
+                 http: Optional["HTTPClient"] = None):
+        set_slot = object.__setattr__
+        set_slot(self, "function", function)
+        set_slot(self, "args", MappingProxyType(args))
+        set_slot(self, "meta_data", MappingProxyType(meta_data))
+        set_slot(self, "meta_data_token", meta_data_token)
+        set_slot(self, "http", http)
+        set_slot(self, "_request", request)
+        set_slot(self, "_store", store)
+        set_slot(self, "_state", None)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+    __delattr__ = __setattr__
+
+    @property
+    def request(self) -> Mapping[str, Any]:
+        request = self._request
+        if callable(request):
+            request = request()
+            object.__setattr__(self, "_request", request)
+        return MappingProxyType(request)
+
+    @property
+    def state(self) -> SWAIGState:
+        """Conversation state: the request meta_data overlaid with what the store holds for the token.
+
+        Loaded on first access. Changes are saved to the store after the handler
+        returns and sent back to SignalWire as set_meta_data/unset_meta_data actions.
+        """
+        if self._state is None:
+            stored = self._store.get(self.meta_data_token) if self._store is not None and self.meta_data_token else None
+            object.__setattr__(self, "_state", SWAIGState({**self.meta_data, **stored} if stored else self.meta_data))
+        return self._state
+
+    def __repr__(self):
+        return f"SWAIGRequestContext(function={self.function!r}, meta_data_token={self.meta_data_token!r})"
+
+_current_context: ContextVar[Optional[SWAIGRequestContext]] = ContextVar("swaig_request_context", default=None)
+
+def current_context() -> Optional[SWAIGRequestContext]:
+    """Return the context of the SWAIG function call being handled, if any."""
+    return _current_context.get()
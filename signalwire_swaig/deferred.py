@@ -0,0 +1,164 @@
+from concurrent.futures import Future
+from typing import Any, Callable, List, Optional
+import asyncio
+import atexit
+import contextvars
+import inspect
+import queue
+import threading
+import time
+from .instrumentation import logger
+
+# Follow-up tasks waiting for a worker; a full queue applies backpressure.
+DEFAULT_DEFERRED_QUEUE_SIZE = 1000
+DEFAULT_DEFERRED_WORKERS = 4
+# How long a request thread waits for queue space before the task is rejected.
+DEFAULT_SUBMIT_TIMEOUT = 1.0
+# How long shutdown (and interpreter exit) waits for queued tasks to finish.
+DEFAULT_DRAIN_TIMEOUT = 30.0
+
+class DeferredQueueFull(RuntimeError):
+    """Raised when a deferred task cannot be queued because the queue stayed full."""
+
+class DeferredExecutor:
+    """Runs follow-up work after a SWAIG response has been produced.
+
+    Tasks go through a bounded queue to ``workers`` daemon threads. When the
+    queue is full, ``submit`` waits up to ``submit_timeout`` seconds for space
+    (``block=False`` does not wait) and then raises DeferredQueueFull.
+    Coroutine functions are run to completion on the worker thread, and tasks
+    see the context variables of the code that submitted them, so
+    ``current_context()`` still works. ``shutdown`` stops intake and drains
+    the queue; it also runs at interpreter exit.
+    """
+
+    def __init__(self, workers: int = DEFAULT_DEFERRED_WORKERS, max_queue: int = DEFAULT_DEFERRED_QUEUE_SIZE,
+                 submit_timeout: float = DEFAULT_SUBMIT_TIMEOUT, drain_timeout: float = DEFAULT_DRAIN_TIMEOUT,
+                 metrics=None):
+        self.workers = workers
+        self.submit_timeout = submit_timeout
+        self.drain_timeout = drain_timeout
+        self._queue: "queue.Queue[Optional[tuple]]" = queue.Queue(maxsize=max_queue)
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._closed = False
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self._metrics = None
+        if metrics is not None:
+            self.bind_metrics(metrics)
+
+    def bind_metrics(self, metrics):
+        """Export queue depth, running tasks, outcomes and durations through a SWAIGMetrics."""
+        from .metrics import Counter, Gauge, Histogram
+        self._metrics = (
+            metrics.register(Gauge("swaig_deferred_queue_depth", "Deferred tasks waiting for a worker.")),
+            metrics.register(Gauge("swaig_deferred_running", "Deferred tasks currently running.")),
+            metrics.register(Counter("swaig_deferred_tasks_total", "Deferred tasks by outcome.", ["outcome"])),
+            metrics.register(Histogram("swaig_deferred_duration_seconds", "Deferred task run time.")),
+        )
+
+    def _start(self):
+        with self._lock:
+            if self._threads or self._closed:
+                return
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._work, name=f"swaig-deferred-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+            atexit.register(self.shutdown)
+
+    def submit(self, func: Callable, *args: Any, block: bool = True, **kwargs: Any) -> Future:
+        """Queue ``func(*args, **kwargs)``; the returned future resolves with its result."""
+        if self._closed:
+            raise RuntimeError("DeferredExecutor is shut down")
+        if not self._threads:
+            self._start()
+        future: Future = Future()
+        task = (future, contextvars.copy_context(), func, args, kwargs)
+        try:
+            self._queue.put(task, block=block, timeout=self.submit_timeout if block else None)
+        except queue.Full:
+            with self._lock:
+                self.rejected += 1
+            if self._metrics:
+                self._metrics[2].inc("rejected")
+            raise DeferredQueueFull(f"Deferred queue is full ({self._queue.maxsize} tasks)") from None
+        if self._metrics:
+            self._metrics[0].set(value=self._queue.qsize())
+        return future
+
+    def _work(self):
+        while True:
+            task = self._queue.get()
+            if self._metrics:
+                self._metrics[0].set(value=self._queue.qsize())
+            if task is None:
+                self._queue.task_done()
+                return
+            future, context, func, args, kwargs = task
+            if not future.set_running_or_notify_cancel():
+                self._queue.task_done()
+                continue
+            with self._lock:
+                self.running += 1
+            if self._metrics:
+                self._metrics[1].inc()
+            started = time.perf_counter()
+            try:
+                result = context.run(func, *args, **kwargs)
+                if inspect.iscoroutine(result):
+                    result = context.run(asyncio.run, result)
+            except BaseException as e:
+                outcome = "failed"
+                logger.warning("Deferred task %s failed: %s", getattr(func, "__name__", func), e)
+                future.set_exception(e)
+            else:
+                outcome = "completed"
+                future.set_result(result)
+            finally:
+                with self._lock:
+                    self.running -= 1
+                    setattr(self, outcome, getattr(self, outcome) + 1)
+                if self._metrics:
+                    self._metrics[1].dec()
+                    self._metrics[2].inc(outcome)
+                    self._metrics[3].observe(value=time.perf_counter() - started)
+                self._queue.task_done()
+
+    def shutdown(self, drain: bool = True, timeout: Optional[float] = None):
+        """Stop accepting tasks and, with ``drain``, wait up to ``timeout`` seconds for queued ones to finish.
+
+        Without ``drain`` the tasks still queued are cancelled.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        if not drain:
+            while True:
+                try:
+                    task = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if task is not None:
+                    task[0].cancel()
+                self._queue.task_done()
+        deadline = time.monotonic() + (timeout if timeout is not None else self.drain_timeout)
+        for _ in self._threads:
+            # Sentinels queue behind the remaining tasks, so workers exit once the queue is drained.
+            try:
+                self._queue.put(None, timeout=max(0, deadline - time.monotonic()))
+            except queue.Full:
+                break
+        for thread in self._threads:
+            thread.join(max(0, deadline - time.monotonic()))
+        pending = self._queue.qsize()
+        if pending:
+            logger.warning("Deferred executor shut down with %d task(s) still queued", pending)
+
+    def stats(self) -> dict:
+        return {"queued": self._queue.qsize(), "running": self.running, "completed": self.completed,
+                "failed": self.failed, "rejected": self.rejected}
@@ -0,0 +1,78 @@
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, Iterator, Optional
+
+class LazyRequest(Mapping):
+    """The full request body as a read-only mapping, decoded from ``raw`` on first access."""
+    __slots__ = ("raw", "_loads", "_data")
+
+    def __init__(self, raw: bytes, loads: Callable[[bytes], Any]):
+        self.raw = raw
+        self._loads = loads
+        self._data: Optional[Dict[str, Any]] = None
+
+    def _decoded(self) -> Dict[str, Any]:
+        if self._data is None:
+            self._data = self._loads(self.raw)
+        return self._data
+
+    def __getitem__(self, key: str) -> Any:
+        return self._decoded()[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._decoded())
+
+    def __len__(self) -> int:
+        return len(self._decoded())
+
+    def __repr__(self):
+        state = "decoded" if self._data is not None else f"{len(self.raw)} bytes"
+        return f"LazyRequest({state})"
+
+class _Envelope(dict):
+    """The decoded dispatch fields of a request, plus the LazyRequest for the whole body."""
+    __slots__ = ("full_request",)
+
+class EnvelopeDecoder:
+    """Decodes only the fields SWAIG dispatches on and keeps the rest of the body as raw bytes.
+
+    ``action``, ``function``, ``argument.parsed``, ``meta_data``,
+    ``meta_data_token``, ``functions`` and the registry field are decoded;
+    everything else (conversation history, call details) is skipped by the
+    parser and only decoded if the handler reads ``meta_data['fullrequest']``
+    or ``ctx.request``. Batch requests, and bodies whose dispatch fields have
+    unexpected types, are decoded in full with ``loads``. Needs msgspec.
+    """
+
+    def __init__(self, loads: Callable[[bytes], Any], registry_field: str = "registry"):
+        import msgspec
+
+        self._loads = loads
+        self._unset = msgspec.UNSET
+        self._validation_error = msgspec.ValidationError
+        self._decode_error = msgspec.DecodeError
+        argument = msgspec.defstruct("Argument", [("parsed", Any, msgspec.UNSET)])
+        self._names = ["action", "function", "meta_data", "meta_data_token", "functions"]
+        if registry_field not in self._names and registry_field != "argument":
+            self._names.append(registry_field)
+        fields = [(name, Any, msgspec.UNSET) for name in self._names] + [("argument", argument, msgspec.UNSET)]
+        self._decoder = msgspec.json.Decoder(msgspec.defstruct("Envelope", fields))
+
+    def __call__(self, body: bytes) -> Dict[str, Any]:
+        """Decode ``body``; raises ValueError on malformed JSON, like JSONCodec.loads."""
+        try:
+            envelope = self._decoder.decode(body)
+        except self._validation_error:
+            return self._loads(body)
+        except self._decode_error as e:
+            raise ValueError(str(e)) from None
+        if envelope.action == "batch":
+            return self._loads(body)
+        data = _Envelope()
+        for name in self._names:
+            value = getattr(envelope, name)
+            if value is not self._unset:
+                data[name] = value
+        if envelope.argument is not self._unset:
+            data["argument"] = {"parsed": envelope.argument.parsed} if envelope.argument.parsed is not self._unset else {}
+        data.full_request = LazyRequest(body, self._loads)
+        return data
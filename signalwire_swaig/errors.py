@@ -0,0 +1,40 @@
+from typing import Any, List, Optional
+
+class SWAIGError(Exception):
+    """Raised to abort a function call with a SWAIG error response carrying the message.
+
+    ``kind`` classifies the failure in metrics (bad_request, not_found, bad_args
+    or handler_exception).
+    """
+    kind = "handler_exception"
+
+    def __init__(self, message: str = "", kind: Optional[str] = None):
+        super().__init__(message)
+        if kind is not None:
+            self.kind = kind
+
+class SWAIGValidationError(SWAIGError):
+    """Raised when call arguments do not match the function's SWAIGArgument schema.
+
+    ``path`` locates the offending value (property names and array indexes) and
+    ``function`` is filled in with the function name once dispatch knows it.
+    """
+    kind = "bad_args"
+
+    def __init__(self, reason: str, path: Optional[List[Any]] = None, function: Optional[str] = None):
+        super().__init__(reason)
+        self.reason = reason
+        self.path = path if path is not None else []
+        self.function = function
+
+    def location(self) -> str:
+        location = ""
+        for part in self.path:
+            location += f"[{part}]" if isinstance(part, int) else (f".{part}" if location else part)
+        return location
+
+    def __str__(self):
+        message = f"argument '{self.location()}' {self.reason}" if self.path else self.reason
+        if self.function:
+            return f"Invalid arguments for function '{self.function}': {message}"
+        return message
@@ -0,0 +1,42 @@
+from typing import Any
+import logging
+import random
+
+logger = logging.getLogger("signalwire_swaig")
+
+class _Truncated:
+    """Defers rendering a payload until a log record is actually formatted."""
+    __slots__ = ("value", "max_chars")
+
+    def __init__(self, value: Any, max_chars: int):
+        self.value = value
+        self.max_chars = max_chars
+
+    def __str__(self):
+        text = str(self.value)
+        if self.max_chars and len(text) > self.max_chars:
+            return f"{text[:self.max_chars]}... ({len(text) - self.max_chars} more chars)"
+        return text
+
+    __repr__ = __str__
+
+class PayloadLogPolicy:
+    """Controls how request payloads, meta_data and results appear in DEBUG logs.
+
+    Payloads are only rendered when a record is emitted, truncated to
+    ``max_chars`` (0 disables truncation), and only for a ``sample_rate``
+    fraction of log calls.
+    """
+
+    def __init__(self, max_chars: int = 2048, sample_rate: float = 1.0):
+        self.max_chars = max_chars
+        self.sample_rate = sample_rate
+
+    def enabled(self, log: logging.Logger = logger) -> bool:
+        """Cheap gate for hot-path payload logging."""
+        if not log.isEnabledFor(logging.DEBUG):
+            return False
+        return self.sample_rate >= 1.0 or random.random() < self.sample_rate
+
+    def render(self, value: Any) -> _Truncated:
+        return _Truncated(value, self.max_chars)
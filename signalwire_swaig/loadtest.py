@@ -0,0 +1,264 @@
+from collections import Counter
+from itertools import count
+from typing import Any, Dict, Iterable, List, Optional
+from urllib.parse import unquote, urlsplit
+import asyncio
+import base64
+import json
+import statistics
+import threading
+import time
+
+PERCENTILES = (50, 90, 95, 99)
+
+class LoadReport:
+    """Latencies and error counts collected by a load run."""
+
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.errors: Counter = Counter()
+        self.elapsed = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, latency: float, error: Optional[str] = None):
+        with self._lock:
+            if error is None:
+                self.latencies.append(latency)
+            else:
+                self.errors[error] += 1
+
+    def summary(self) -> Dict[str, Any]:
+        ok = len(self.latencies)
+        total = ok + sum(self.errors.values())
+        result = {
+            "requests": total,
+            "ok": ok,
+            "errors": dict(self.errors),
+            "elapsed_s": round(self.elapsed, 3),
+            "throughput_rps": round(total / self.elapsed, 1) if self.elapsed else 0.0,
+        }
+        if ok:
+            ordered = sorted(self.latencies)
+            latency = {"min": ordered[0], "mean": statistics.fmean(ordered)}
+            for p in PERCENTILES:
+                latency[f"p{p}"] = ordered[min(ok - 1, int(round(p / 100 * (ok - 1))))]
+            latency["max"] = ordered[-1]
+            result["latency_ms"] = {name: round(value * 1000, 3) for name, value in latency.items()}
+        return result
+
+    def format(self) -> str:
+        summary = self.summary()
+        lines = [
+            f"Requests:   {summary['requests']} ({summary['ok']} ok, {summary['requests'] - summary['ok']} failed)",
+            f"Elapsed:    {summary['elapsed_s']:.3f} s",
+            f"Throughput: {summary['throughput_rps']:.1f} req/s",
+        ]
+        if "latency_ms" in summary:
+            lines.append("Latency (ms):")
+            lines.extend(f"  {name:>5}  {value:10.3f}" for name, value in summary["latency_ms"].items())
+        if summary["errors"]:
+            lines.append("Errors:")
+            lines.extend(f"  {kind:<20} {number}" for kind, number in sorted(summary["errors"].items()))
+        return "\n".join(lines)
+
+def sample_value(schema: Dict[str, Any]) -> Any:
+    """Build a value that satisfies a SWAIG argument schema, for generated load."""
+    if schema.get("enum"):
+        return schema["enum"][0]
+    if "default" in schema:
+        return schema["default"]
+    kind = schema.get("type")
+    if kind == "object":
+        return {name: sample_value(prop) for name, prop in schema.get("properties", {}).items()}
+    if kind == "array":
+        return [sample_value(schema.get("items", {}))]
+    if kind == "integer":
+        return schema.get("minimum", 1)
+    if kind == "number":
+        return float(schema.get("minimum", 1.0))
+    if kind == "boolean":
+        return True
+    return "test"
+
+def sample_arguments(signature: Dict[str, Any]) -> Dict[str, Any]:
+    return sample_value(signature.get("parameters", {"type": "object"}))
+
+def call_payload(function: str, args: Dict[str, Any], meta_data: Optional[Dict[str, Any]] = None,
+                 meta_data_token: str = "swaig-cli") -> Dict[str, Any]:
+    return {"function": function, "argument": {"parsed": [args]}, "meta_data": meta_data or {},
+            "meta_data_token": meta_data_token}
+
+def load_replay(lines: Iterable[str], function: Optional[str], known: Iterable[str],
+                meta_data: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    """Turn JSONL lines into request payloads.
+
+    Each line is a full SWAIG request (with ``function`` and ``argument``), an
+    object ``{"function": ..., "args": {...}, "meta_data": {...}}``, or a bare
+    argument object for ``function``. Functions the server did not advertise
+    are rejected up front.
+    """
+    known = set(known)
+    payloads = []
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            entry = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"line {number}: invalid JSON ({e})") from None
+        if not isinstance(entry, dict):
+            raise ValueError(f"line {number}: expected a JSON object")
+        if "argument" in entry or "action" in entry:
+            payload = entry
+        elif "args" in entry:
+            payload = call_payload(entry.get("function", function), entry["args"], entry.get("meta_data", meta_data),
+                                   entry.get("meta_data_token", "swaig-cli"))
+        else:
+            payload = call_payload(function, entry, meta_data)
+        name = payload.get("function")
+        if "action" not in payload and name not in known:
+            raise ValueError(f"line {number}: function {name!r} is not advertised by the server")
+        payloads.append(payload)
+    if not payloads:
+        raise ValueError("replay file contains no requests")
+    return payloads
+
+def _classify(status: int, body: bytes) -> Optional[str]:
+    if status != 200:
+        return f"http_{status}"
+    try:
+        data = json.loads(body)
+    except ValueError:
+        return "invalid_json"
+    if isinstance(data, dict) and "response" not in data and "results" not in data:
+        return "missing_response"
+    return None
+
+def _schedule(total: Optional[int], duration: Optional[float]):
+    """Return a thread-safe ``next_index()`` that yields request numbers until the run should stop."""
+    counter = count()
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration if duration else None
+
+    def next_index() -> Optional[int]:
+        if deadline is not None and time.perf_counter() >= deadline:
+            return None
+        with lock:
+            index = next(counter)
+        return index if total is None or index < total else None
+    return next_index
+
+def run_threads(url: str, payloads: List[Dict[str, Any]], total: Optional[int] = 1000, concurrency: int = 10,
+                duration: Optional[float] = None, timeout: float = 30) -> LoadReport:
+    """Fire requests from ``concurrency`` threads, each holding one keep-alive connection."""
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    bodies = [json.dumps(payload).encode() for payload in payloads]
+    report = LoadReport()
+    next_index = _schedule(total, duration)
+
+    def worker():
+        session = requests.Session()
+        session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=1))
+        session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=1))
+        headers = {"Content-Type": "application/json"}
+        while (index := next_index()) is not None:
+            started = time.perf_counter()
+            try:
+                response = session.post(url, data=bodies[index % len(bodies)], headers=headers, timeout=timeout)
+                error = _classify(response.status_code, response.content)
+            except requests.Timeout:
+                error = "timeout"
+            except requests.ConnectionError:
+                error = "connection"
+            report.record(time.perf_counter() - started, error)
+        session.close()
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    report.elapsed = time.perf_counter() - started
+    return report
+
+class _AsyncConnection:
+    """Minimal HTTP/1.1 keep-alive client for POSTing JSON; no third-party dependency."""
+
+    def __init__(self, url: str):
+        parts = urlsplit(url)
+        self.host = parts.hostname
+        self.ssl = parts.scheme == "https"
+        self.port = parts.port or (443 if self.ssl else 80)
+        self.path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        self.head = f"POST {self.path} HTTP/1.1\r\nHost: {parts.netloc.rpartition('@')[2]}\r\n" \
+                    "Content-Type: application/json\r\nConnection: keep-alive\r\n"
+        if parts.username is not None:
+            credentials = f"{unquote(parts.username)}:{unquote(parts.password or '')}".encode()
+            self.head += f"Authorization: Basic {base64.b64encode(credentials).decode()}\r\n"
+        self.reader = self.writer = None
+
+    async def post(self, body: bytes):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port, ssl=self.ssl or None)
+        self.writer.write(f"{self.head}Content-Length: {len(body)}\r\n\r\n".encode() + body)
+        await self.writer.drain()
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError("connection closed by server")
+        status = int(status_line.split()[1])
+        headers = {}
+        while (line := await self.reader.readline()) not in (b"\r\n", b"\n", b""):
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while (size := int((await self.reader.readline()).split(b";")[0], 16)):
+                chunks.append(await self.reader.readexactly(size))
+                await self.reader.readline()
+            await self.reader.readline()
+            body = b"".join(chunks)
+        elif "content-length" in headers:
+            body = await self.reader.readexactly(int(headers["content-length"]))
+        else:
+            body = await self.reader.read()
+            headers["connection"] = "close"
+        if headers.get("connection", "").lower() == "close":
+            self.close()
+        return status, body
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+async def run_asyncio(url: str, payloads: List[Dict[str, Any]], total: Optional[int] = 1000, concurrency: int = 10,
+                      duration: Optional[float] = None, timeout: float = 30) -> LoadReport:
+    """Fire requests from ``concurrency`` coroutines on one event loop, each with its own keep-alive connection."""
+    bodies = [json.dumps(payload).encode() for payload in payloads]
+    report = LoadReport()
+    next_index = _schedule(total, duration)
+
+    async def worker():
+        connection = _AsyncConnection(url)
+        while (index := next_index()) is not None:
+            started = time.perf_counter()
+            try:
+                status, body = await asyncio.wait_for(connection.post(bodies[index % len(bodies)]), timeout)
+                error = _classify(status, body)
+            except asyncio.TimeoutError:
+                connection.close()
+                error = "timeout"
+            except (OSError, ValueError, IndexError, asyncio.IncompleteReadError):
+                connection.close()
+                error = "connection"
+            report.record(time.perf_counter() - started, error)
+        connection.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    report.elapsed = time.perf_counter() - started
+    return report
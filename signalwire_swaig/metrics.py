@@ -0,0 +1,131 @@
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Tuple
+import threading
+
+# Latency buckets in seconds, tuned for tool calls that are expected to answer well under a few seconds.
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def _header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0)
+
+    def render(self) -> List[str]:
+        lines = self._header()
+        with self._lock:
+            items = list(self._values.items())
+        for labels, value in items:
+            lines.append(f"{self.name}{_labels(self.labelnames, labels)} {value:g}")
+        return lines
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *labels: str, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def inc(self, *labels: str, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, *labels: str, amount: float = 1):
+        self.inc(*labels, amount=-amount)
+
+    def set(self, *labels: str, value: float):
+        with self._lock:
+            self._values[labels] = value
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (), buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, *labels: str, value: float):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                # One slot per bucket plus +Inf, then sum and count.
+                series = self._series[labels] = [0] * (len(self.buckets) + 3)
+            series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def count(self, *labels: str) -> int:
+        series = self._series.get(labels)
+        return int(series[-1]) if series else 0
+
+    def render(self) -> List[str]:
+        lines = self._header()
+        with self._lock:
+            items = [(labels, list(series)) for labels, series in self._series.items()]
+        for labels, series in items:
+            cumulative = 0
+            for bound, observed in zip(self.buckets + (float("inf"),), series):
+                cumulative += observed
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{bound:g}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative:g}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {series[-2]:g}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {series[-1]:g}")
+        return lines
+
+class SWAIGMetrics:
+    """Request, latency, error and in-flight metrics for a SWAIG instance, rendered in Prometheus text format."""
+
+    content_type = "text/plain; version=0.0.4; charset=utf-8"
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.requests = Counter("swaig_requests_total", "Requests to the SWAIG route by action.", ["action"])
+        self.request_latency = Histogram("swaig_request_duration_seconds", "Request latency by action.", ["action"], buckets)
+        self.in_flight = Gauge("swaig_requests_in_flight", "Requests currently being handled.")
+        self.calls = Counter("swaig_function_calls_total", "Function calls by function name.", ["function"])
+        self.call_latency = Histogram("swaig_function_duration_seconds", "Function call latency by function name.", ["function"], buckets)
+        self.calls_in_flight = Gauge("swaig_function_calls_in_flight", "Function calls currently running.", ["function"])
+        self.errors = Counter("swaig_errors_total", "Failed requests and calls by kind.", ["kind"])
+        self._collectors = [self.requests, self.request_latency, self.in_flight, self.calls, self.call_latency,
+                            self.calls_in_flight, self.errors]
+        # Function label -> SWAIGCache, filled in by SWAIG.endpoint so cache counters are exported too.
+        self.caches: Dict[str, object] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        """Add a metric to the exported set."""
+        self._collectors.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for collector in self._collectors:
+            lines.extend(collector.render())
+        if self.caches:
+            for field in ("hits", "misses", "coalesced"):
+                lines.append(f"# TYPE swaig_cache_{field}_total counter")
+                for function, cache in self.caches.items():
+                    lines.append(f'swaig_cache_{field}_total{{function="{_escape(function)}"}} {getattr(cache, field)}')
+        return "\n".join(lines) + "\n"
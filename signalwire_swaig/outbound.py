@@ -0,0 +1,173 @@
+from typing import Any, Dict, Optional, Sequence, Tuple, Union
+from urllib.parse import urlsplit
+import threading
+import time
+import weakref
+
+# Keep-alive connections kept per upstream host.
+DEFAULT_POOL_MAXSIZE = 10
+# Upstream hosts with a connection pool kept open.
+DEFAULT_POOL_HOSTS = 20
+# (connect, read) seconds; tool calls are latency bound, so fail fast.
+DEFAULT_HTTP_TIMEOUT = (3.05, 10.0)
+DEFAULT_RETRIES = 2
+DEFAULT_RETRY_BACKOFF = 0.2
+DEFAULT_RETRY_STATUSES = (502, 503, 504)
+
+def _host(url: str) -> str:
+    return urlsplit(str(url)).netloc or "unknown"
+
+def _outcome(status: int) -> str:
+    return f"{status // 100}xx"
+
+class HTTPClient:
+    """Outbound HTTP shared by every handler of a SWAIG.
+
+    ``session`` is a requests Session and ``async_client`` an httpx
+    AsyncClient (one per event loop). Both are created on first use and keep
+    up to ``pool_maxsize`` connections per host alive across calls, so
+    repeated tool calls to the same API skip the TCP and TLS handshakes.
+    Requests without an explicit ``timeout`` get ``timeout``, and idempotent
+    requests are retried ``retries`` times on connection errors and
+    ``retry_statuses``. Handlers reach it as ``ctx.http`` or ``swaig.http``.
+
+    requests and httpx are optional; install them with
+    ``pip install signalwire-swaig[http]``.
+    """
+
+    def __init__(self, pool_maxsize: int = DEFAULT_POOL_MAXSIZE, pool_hosts: int = DEFAULT_POOL_HOSTS,
+                 pool_block: bool = False, timeout: Union[float, Tuple[float, float]] = DEFAULT_HTTP_TIMEOUT,
+                 retries: int = DEFAULT_RETRIES, retry_backoff: float = DEFAULT_RETRY_BACKOFF,
+                 retry_statuses: Sequence[int] = DEFAULT_RETRY_STATUSES, headers: Optional[Dict[str, str]] = None,
+                 metrics=None):
+        self.pool_maxsize = pool_maxsize
+        self.pool_hosts = pool_hosts
+        self.pool_block = pool_block
+        self.timeout = timeout
+        self.retries = retries
+        self.retry_backoff = retry_backoff
+        self.retry_statuses = tuple(retry_statuses)
+        self.headers = dict(headers or {})
+        self._session = None
+        self._async_clients: "weakref.WeakKeyDictionary[Any, Any]" = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self._metrics = None
+        if metrics is not None:
+            self.bind_metrics(metrics)
+
+    def bind_metrics(self, metrics):
+        """Export request counts and latency per host, in-flight requests and connections opened."""
+        from .metrics import Counter, Gauge, Histogram
+        self._metrics = (
+            metrics.register(Counter("swaig_http_requests_total", "Outbound HTTP requests by host and outcome.", ["host", "outcome"])),
+            metrics.register(Histogram("swaig_http_request_duration_seconds", "Outbound HTTP request time.", ["host"])),
+            metrics.register(Gauge("swaig_http_in_flight", "Outbound HTTP requests in progress on the sync session.")),
+            metrics.register(Gauge("swaig_http_connections_opened", "Connections opened per upstream host by the sync pool.", ["host"])),
+        )
+
+    def _record(self, host: str, outcome: str, elapsed: float):
+        if self._metrics:
+            self._metrics[0].inc(host, outcome)
+            self._metrics[1].observe(host, value=elapsed)
+
+    @property
+    def session(self):
+        """The pooled requests Session, safe to share between handler threads."""
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    self._session = self._build_session()
+        return self._session
+
+    def _build_session(self):
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        client = self
+
+        class _Adapter(HTTPAdapter):
+            def send(self, request, **kwargs):
+                if kwargs.get("timeout") is None:
+                    kwargs["timeout"] = client.timeout
+                host = _host(request.url)
+                started = time.perf_counter()
+                if client._metrics:
+                    client._metrics[2].inc()
+                try:
+                    response = super().send(request, **kwargs)
+                except Exception:
+                    client._record(host, "error", time.perf_counter() - started)
+                    raise
+                finally:
+                    if client._metrics:
+                        client._metrics[2].dec()
+                client._record(host, _outcome(response.status_code), time.perf_counter() - started)
+                pool = getattr(response.raw, "_pool", None)
+                if client._metrics and pool is not None:
+                    client._metrics[3].set(host, value=pool.num_connections)
+                return response
+
+        retry = Retry(total=self.retries, connect=self.retries, read=self.retries, backoff_factor=self.retry_backoff,
+                      status_forcelist=self.retry_statuses, raise_on_status=False)
+        adapter = _Adapter(pool_connections=self.pool_hosts, pool_maxsize=self.pool_maxsize,
+                           max_retries=retry, pool_block=self.pool_block)
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers.update(self.headers)
+        return session
+
+    @property
+    def async_client(self):
+        """An httpx AsyncClient for the running event loop, with the same limits and timeouts."""
+        import asyncio
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            client = self._async_clients[loop] = self._build_async_client()
+        return client
+
+    def _build_async_client(self):
+        import httpx
+
+        timeout = self.timeout if isinstance(self.timeout, tuple) else (self.timeout, self.timeout)
+        hooks = {}
+        if self._metrics:
+            async def on_request(request):
+                request.extensions["swaig_started"] = time.perf_counter()
+
+            async def on_response(response):
+                started = response.request.extensions.get("swaig_started", time.perf_counter())
+                self._record(_host(response.request.url), _outcome(response.status_code), time.perf_counter() - started)
+            hooks = {"request": [on_request], "response": [on_response]}
+        # httpx limits connections overall rather than per host.
+        return httpx.AsyncClient(
+            timeout=httpx.Timeout(timeout[1], connect=timeout[0]),
+            limits=httpx.Limits(max_connections=self.pool_maxsize * self.pool_hosts,
+                                max_keepalive_connections=self.pool_maxsize * self.pool_hosts),
+            # httpx retries connection failures only; status retries are left to the caller.
+            transport=httpx.AsyncHTTPTransport(retries=self.retries),
+            headers=self.headers, event_hooks=hooks)
+
+    def get(self, url: str, **kwargs):
+        return self.session.get(url, **kwargs)
+
+    def post(self, url: str, **kwargs):
+        return self.session.post(url, **kwargs)
+
+    def request(self, method: str, url: str, **kwargs):
+        return self.session.request(method, url, **kwargs)
+
+    async def aclose(self):
+        """Close the async client of the running loop."""
+        import asyncio
+        client = self._async_clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+
+    def close(self):
+        """Close the sync session's pooled connections."""
+        if self._session is not None:
+            self._session.close()
+            self._session = None
@@ -1,9 +1,11 @@
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, List, Tuple
 
 class SWAIGResponse:
     def __init__(self, response: Any = None):
         self.response = response
         self.actions: List[Dict[str, Any]] = []
+        # (func, args, kwargs) run on the SWAIG deferred executor once the response body is built.
+        self.deferred: List[Tuple[Callable, tuple, Dict[str, Any]]] = []
 
     def set_response(self, response: Any):
         self.response = response
@@ -11,6 +13,11 @@ class SWAIGResponse:
     def add_action(self, action_type: str, value: Any):
         self.actions.append({action_type: value})
 
+    def defer(self, func: Callable, *args: Any, **kwargs: Any) -> "SWAIGResponse":
+        """Run ``func(*args, **kwargs)`` in the background after this response is returned."""
+        self.deferred.append((func, args, kwargs))
+        return self
+
     def to_dict(self) -> Dict[str, Any]:
         resp = {"response": self.response}
         if self.actions:
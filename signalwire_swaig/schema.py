@@ -0,0 +1,189 @@
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Union
+import hashlib
+import json
+import threading
+import weakref
+
+@dataclass
+class SWAIGArgumentItems:
+    type: str
+    enum: Optional[List[str]] = None
+    properties: Optional[Dict[str, 'SWAIGArgument']] = None
+    required: Optional[List[str]] = None
+    items: Optional['SWAIGArgumentItems'] = None
+
+@dataclass
+class SWAIGArgument:
+    type: str
+    description: str
+    required: bool = False
+    default: Optional[Any] = None
+    enum: Optional[List[str]] = None
+    items: Optional[SWAIGArgumentItems] = None
+
+@dataclass
+class SWAIGFunctionProperties:
+    active: Optional[bool] = None
+    wait_file: Optional[str] = None
+    wait_file_loops: Optional[Union[int, str]] = None
+    wait_for_fillers: Optional[bool] = None
+    fillers: Optional[Dict[str, List[str]]] = None
+
+def _without_none(value: Any) -> Any:
+    """Drop None values from nested dicts and lists, as signatures have always done."""
+    if isinstance(value, dict):
+        return {k: _without_none(v) for k, v in value.items() if v is not None}
+    if isinstance(value, list):
+        return [_without_none(v) for v in value if v is not None]
+    return value
+
+class _Frozen:
+    __slots__ = ()
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    __delattr__ = __setattr__
+
+    def _init(self, **fields):
+        for name, value in fields.items():
+            object.__setattr__(self, name, value)
+
+class CompiledSchema(_Frozen):
+    """An argument schema compiled from a SWAIGArgument or SWAIGArgumentItems, with its JSON rendered once."""
+    __slots__ = ("type", "description", "enum", "default", "properties", "required", "items", "json", "__weakref__")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return json.loads(self.json)
+
+    def __repr__(self):
+        return f"CompiledSchema(type={self.type!r}, json={self.json[:60]!r})"
+
+class CompiledParameters(_Frozen):
+    """The ``parameters`` object of a signature: named argument schemas and the required names."""
+    __slots__ = ("properties", "required", "json", "__weakref__")
+
+class CompiledFunctionProperties(_Frozen):
+    """SWAIGFunctionProperties as a pre-rendered fragment of signature members."""
+    __slots__ = ("values", "json", "__weakref__")
+
+class CompiledFunction(_Frozen):
+    """A registered function's signature.
+
+    ``head`` is the serialized signature up to and including the
+    ``"parameters":`` key, and ``parameters`` is shared by every function with
+    the same arguments; the entry is left open so the per-host
+    ``web_hook_url`` can be appended.
+    """
+    __slots__ = ("name", "description", "properties", "parameters", "head", "digest")
+
+    @property
+    def entry(self) -> bytes:
+        return self.head + self.parameters.json
+
+    def to_dict(self) -> Dict[str, Any]:
+        return json.loads(self.entry + b"}")
+
+    def __repr__(self):
+        return f"CompiledFunction(name={self.name!r})"
+
+class SchemaCompiler:
+    """Compiles endpoint declarations into immutable, interned signature parts.
+
+    Equal argument schemas, parameter sets and function properties compile to
+    the same object, so a catalog of functions built from shared definitions
+    stores each distinct sub-schema and its JSON once.
+    """
+
+    def __init__(self, dumps: Callable[[Any], bytes]):
+        self.dumps = dumps
+        self._interned: "weakref.WeakValueDictionary[tuple, Any]" = weakref.WeakValueDictionary()
+        self._lock = threading.Lock()
+
+    def _intern(self, key: tuple, build: Callable[[], Any]) -> Any:
+        with self._lock:
+            compiled = self._interned.get(key)
+            if compiled is None:
+                compiled = self._interned[key] = build()
+            return compiled
+
+    def _member(self, name: str, value: Any) -> bytes:
+        return self.dumps(name) + b":" + self.dumps(value)
+
+    def argument(self, param) -> CompiledSchema:
+        """Compile a SWAIGArgument or SWAIGArgumentItems (nested properties and items included)."""
+        description = getattr(param, "description", None) or None
+        enum = _without_none(param.enum) if getattr(param, "enum", None) else None
+        default = _without_none(param.default) if getattr(param, "default", None) is not None else None
+        properties = required = items = None
+        if param.type == "object" and getattr(param, "properties", None):
+            properties = tuple((name, self.argument(child)) for name, child in param.properties.items())
+            if getattr(param, "required", None):
+                required = tuple(_without_none(list(param.required)))
+        if param.type == "array" and getattr(param, "items", None):
+            items = self.argument(param.items)
+        enum_json = self.dumps(enum) if enum is not None else None
+        default_json = self.dumps(default) if default is not None else None
+        key = ("argument", param.type, description, enum_json, default_json, properties, required, items)
+
+        def build():
+            members = [self._member("type", param.type)]
+            if description is not None:
+                members.append(self._member("description", description))
+            if enum_json is not None:
+                members.append(b'"enum":' + enum_json)
+            if default_json is not None:
+                members.append(b'"default":' + default_json)
+            if properties is not None:
+                members.append(b'"properties":{' + b",".join(self.dumps(name) + b":" + child.json for name, child in properties) + b"}")
+                if required is not None:
+                    members.append(self._member("required", list(required)))
+            if items is not None:
+                members.append(b'"items":' + items.json)
+            compiled = CompiledSchema.__new__(CompiledSchema)
+            compiled._init(type=param.type, description=description, enum=tuple(enum) if enum is not None else None,
+                           default=default, properties=properties, required=required, items=items,
+                           json=b"{" + b",".join(members) + b"}")
+            return compiled
+        return self._intern(key, build)
+
+    def parameters(self, params: Dict[str, Any]) -> CompiledParameters:
+        properties = tuple((name, self.argument(param)) for name, param in params.items())
+        required = tuple(name for name, param in params.items() if param.required)
+
+        def build():
+            body = b",".join(self.dumps(name) + b":" + schema.json for name, schema in properties)
+            compiled = CompiledParameters.__new__(CompiledParameters)
+            compiled._init(properties=properties, required=required,
+                           json=b'{"type":"object","properties":{' + body + b'},"required":' + self.dumps(list(required)) + b"}")
+            return compiled
+        return self._intern(("parameters", properties, required), build)
+
+    def function_properties(self, function_properties) -> CompiledFunctionProperties:
+        values = tuple((name, _without_none(value)) for name, value in vars(function_properties).items() if value is not None) \
+            if function_properties else ()
+        rendered = b",".join(self._member(name, value) for name, value in values)
+
+        def build():
+            compiled = CompiledFunctionProperties.__new__(CompiledFunctionProperties)
+            compiled._init(values=values, json=rendered)
+            return compiled
+        return self._intern(("function_properties", rendered), build)
+
+    def function(self, name: str, description: Optional[str], function_properties, params: Dict[str, Any]) -> CompiledFunction:
+        properties = self.function_properties(function_properties)
+        parameters = self.parameters(params)
+        members = [self._member("function", name)]
+        if description is not None:
+            members.insert(0, self._member("description", description))
+        if properties.json:
+            members.append(properties.json)
+        head = b"{" + b",".join(members) + b',"parameters":'
+        compiled = CompiledFunction.__new__(CompiledFunction)
+        compiled._init(name=name, description=description, properties=properties, parameters=parameters, head=head,
+                       digest=hashlib.blake2b(head + parameters.json + b"}", digest_size=16).digest())
+        return compiled
+
+    def __len__(self):
+        return len(self._interned)
@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""Prefork server for SWAIG applications.
+
+    swaig serve myapp:app --bind 0.0.0.0:5000 --workers 4
+
+The master imports the application once and builds its signature caches,
+then forks the workers so they share that memory copy-on-write. Workers
+that exit (including after ``--max-requests``) are replaced. SIGHUP
+re-imports the application and replaces the workers one by one. SIGTERM or
+SIGINT stops the workers gracefully, and each worker drains its deferred
+tasks before exiting.
+"""
+import argparse
+import gc
+import importlib
+import logging
+import os
+import random
+import signal
+import socket
+import sys
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+from .instrumentation import logger
+
+DEFAULT_BIND = "127.0.0.1:5000"
+DEFAULT_BACKLOG = 2048
+# Seconds a worker may take to finish in-flight requests before it is killed.
+DEFAULT_GRACEFUL_TIMEOUT = 30.0
+
+def load_target(target: str) -> Tuple[Any, Any]:
+    """Import ``module:attribute`` and return (module, attribute)."""
+    module_name, _, attribute = target.partition(":")
+    module = importlib.import_module(module_name)
+    return module, _resolve(module, attribute or "app", target)
+
+def _resolve(module, attribute: str, target: str) -> Any:
+    try:
+        obj = module
+        for part in attribute.split("."):
+            obj = getattr(obj, part)
+    except AttributeError:
+        raise SystemExit(f"Error: {target!r} does not name an attribute of {module.__name__}") from None
+    return obj
+
+def find_swaig(app: Any):
+    """The SWAIG serving ``app``: the object itself, or the one a Flask app was initialised with."""
+    from .swaig import SWAIG
+    if isinstance(app, SWAIG):
+        return app
+    extensions = getattr(app, "extensions", None) or {}
+    return extensions.get("swaig")
+
+def as_application(app: Any) -> Tuple[Any, bool]:
+    """Return (application, is_asgi) for a Flask app, SWAIG or AsyncSWAIG."""
+    from .asgi import AsyncSWAIG
+    from .swaig import SWAIG
+    if isinstance(app, AsyncSWAIG):
+        return app, True
+    if isinstance(app, SWAIG):
+        if app.app is None:
+            raise SystemExit("Error: the SWAIG instance is not attached to a Flask app")
+        return app.app, False
+    return app, False
+
+def preload(app: Any, public_url: Optional[str] = None, signatures: Optional[str] = None):
+    """Build the signature caches of the app's SWAIG and freeze the heap so forked workers share it.
+
+    With ``public_url``, signatures point at that URL whatever Host requests
+    use, so the bodies built here are the ones served. With ``signatures``,
+    the snapshot must match the registered functions.
+    """
+    swaig = find_swaig(app)
+    if swaig is not None:
+        if public_url is not None:
+            swaig.set_public_url(public_url)
+        if signatures is not None:
+            try:
+                swaig.load_signatures(signatures)
+            except (OSError, ValueError) as e:
+                raise SystemExit(f"Error: {e}") from None
+        else:
+            swaig.preload()
+    gc.collect()
+    if hasattr(gc, "freeze"):
+        # Keep the collector from touching (and so copying) pages inherited from the master.
+        gc.freeze()
+
+def parse_bind(bind: str) -> Tuple[str, int]:
+    host, _, port = bind.rpartition(":")
+    return host.strip("[]") or "0.0.0.0", int(port)
+
+def listen(host: str, port: int, reuse_port: bool, backlog: int = DEFAULT_BACKLOG) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if reuse_port:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+class _WorkerApp:
+    """WSGI middleware counting in-flight requests and stopping the worker after ``limit`` requests."""
+
+    def __init__(self, app, limit: int, stop):
+        self.app = app
+        self.remaining = limit
+        self.stop = stop
+        self.active = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, environ, start_response):
+        with self._lock:
+            self.active += 1
+        try:
+            return self.app(environ, start_response)
+        finally:
+            with self._lock:
+                self.active -= 1
+                self.remaining -= 1
+                if self.remaining == 0:
+                    logger.info("Worker %s reached its request limit, recycling", os.getpid())
+                    self.stop()
+
+def _serve_wsgi(app, sock: socket.socket, max_requests: int, graceful_timeout: float):
+    from werkzeug.serving import make_server
+    host, port = sock.getsockname()[:2]
+
+    def stop(*_):
+        # shutdown() waits for serve_forever to return, so it cannot run on the serving thread.
+        threading.Thread(target=server.shutdown, daemon=True).start()
+    counted = _WorkerApp(app, max_requests or -1, stop)
+    server = make_server(host, port, counted, threaded=True, fd=sock.fileno())
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    server.serve_forever()
+    server.socket.close()
+    deadline = time.monotonic() + graceful_timeout
+    while counted.active and time.monotonic() < deadline:
+        time.sleep(0.01)
+    swaig = find_swaig(app)
+    if swaig is not None:
+        swaig.shutdown(timeout=max(0, deadline - time.monotonic()))
+
+def _serve_asgi(app, sock: socket.socket, max_requests: int):
+    try:
+        import uvicorn
+    except ImportError:
+        raise SystemExit("Error: serving an AsyncSWAIG needs uvicorn (pip install uvicorn)") from None
+    config = uvicorn.Config(app, lifespan="on", log_level="warning", limit_max_requests=max_requests or None)
+    uvicorn.Server(config).run(sockets=[sock])
+
+def worker(app, is_asgi: bool, sock: Optional[socket.socket], bind: Tuple[str, int], reuse_port: bool,
+           max_requests: int, graceful_timeout: float):
+    """Body of a forked worker process; never returns."""
+    status = 0
+    try:
+        signal.signal(signal.SIGHUP, signal.SIG_IGN)
+        if sock is None:
+            sock = listen(*bind, reuse_port=True)
+        if is_asgi:
+            _serve_asgi(app, sock, max_requests)
+        else:
+            _serve_wsgi(app, sock, max_requests, graceful_timeout)
+    except SystemExit as e:
+        print(e, file=sys.stderr)
+        status = 1
+    except BaseException:
+        logger.exception("Worker %s failed", os.getpid())
+        status = 1
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os._exit(status)
+
+class Arbiter:
+    """Forks and supervises the worker processes."""
+
+    def __init__(self, target: str, bind: str = DEFAULT_BIND, workers: Optional[int] = None, reuse_port: bool = False,
+                 max_requests: int = 0, max_requests_jitter: int = 0, graceful_timeout: float = DEFAULT_GRACEFUL_TIMEOUT,
+                 public_url: Optional[str] = None, signatures: Optional[str] = None):
+        self.target = target
+        self.bind = parse_bind(bind)
+        self.workers = workers or os.cpu_count() or 1
+        self.reuse_port = reuse_port
+        self.max_requests = max_requests
+        self.max_requests_jitter = max_requests_jitter
+        self.graceful_timeout = graceful_timeout
+        self.public_url = public_url
+        self.signatures = signatures
+        self.children: Dict[int, float] = {}
+        self.module = None
+        self.app = None
+        self.is_asgi = False
+        self.sock: Optional[socket.socket] = None
+        self._signal: Optional[int] = None
+
+    def load(self):
+        if self.module is None:
+            self.module, app = load_target(self.target)
+        else:
+            if hasattr(gc, "unfreeze"):
+                gc.unfreeze()
+            self.module = importlib.reload(self.module)
+            app = _resolve(self.module, self.target.partition(":")[2] or "app", self.target)
+        self.app, self.is_asgi = as_application(app)
+        preload(app, self.public_url, self.signatures)
+
+    def spawn(self):
+        limit = self.max_requests + random.randint(0, self.max_requests_jitter) if self.max_requests else 0
+        pid = os.fork()
+        if pid == 0:
+            worker(self.app, self.is_asgi, self.sock, self.bind, self.reuse_port, limit, self.graceful_timeout)
+        self.children[pid] = time.monotonic()
+        return pid
+
+    def _on_signal(self, signum, _frame):
+        self._signal = signum
+
+    def reap(self) -> list:
+        exited = []
+        while True:
+            try:
+                pid, _ = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid == 0:
+                break
+            if self.children.pop(pid, None) is not None:
+                exited.append(pid)
+        return exited
+
+    def stop_workers(self, pids, timeout: float):
+        for pid in pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        deadline = time.monotonic() + timeout
+        while any(pid in self.children for pid in pids) and time.monotonic() < deadline:
+            self.reap()
+            time.sleep(0.05)
+        for pid in pids:
+            if pid in self.children:
+                logger.warning("Worker %s did not stop in %ss, killing it", pid, timeout)
+                os.kill(pid, signal.SIGKILL)
+        while any(pid in self.children for pid in pids):
+            self.reap()
+            time.sleep(0.01)
+
+    def reload(self):
+        """Re-import the application, then replace the workers one at a time."""
+        logger.info("Reloading %s", self.target)
+        try:
+            self.load()
+        except BaseException:
+            logger.exception("Reload failed, keeping the current workers")
+            return
+        for pid in list(self.children):
+            self.spawn()
+            self.stop_workers([pid], self.graceful_timeout)
+
+    def run(self):
+        self.load()
+        if not self.reuse_port:
+            self.sock = listen(*self.bind, reuse_port=False)
+        for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP):
+            signal.signal(signum, self._on_signal)
+        logger.info("Serving %s on %s:%s with %d workers", self.target, *self.bind, self.workers)
+        for _ in range(self.workers):
+            self.spawn()
+        while True:
+            signum, self._signal = self._signal, None
+            if signum in (signal.SIGTERM, signal.SIGINT):
+                break
+            if signum == signal.SIGHUP:
+                self.reload()
+            for pid in self.reap():
+                logger.info("Worker %s exited, starting a new one", pid)
+                self.spawn()
+            time.sleep(0.1)
+        self.stop_workers(list(self.children), self.graceful_timeout)
+        if self.sock is not None:
+            self.sock.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="swaig", description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve = commands.add_parser("serve", help="Serve a SWAIG application with preforked workers")
+    serve.add_argument("target", help="module:attribute naming a Flask app, SWAIG or AsyncSWAIG (attribute defaults to app)")
+    serve.add_argument("--bind", default=DEFAULT_BIND, help=f"host:port to listen on (default: {DEFAULT_BIND})")
+    serve.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    serve.add_argument("--reuse-port", action="store_true",
+                       help="Give each worker its own SO_REUSEPORT socket so the kernel balances connections")
+    serve.add_argument("--max-requests", type=int, default=0, help="Recycle a worker after this many requests (default: never)")
+    serve.add_argument("--max-requests-jitter", type=int, default=0, help="Add up to this many requests to each worker's limit")
+    serve.add_argument("--graceful-timeout", type=float, default=DEFAULT_GRACEFUL_TIMEOUT,
+                       help=f"Seconds workers get to finish in-flight requests (default: {DEFAULT_GRACEFUL_TIMEOUT:g})")
+    serve.add_argument("--public-url", help="URL SignalWire reaches the server at; signatures point at it and are built before forking")
+    serve.add_argument("--signatures", metavar="FILE",
+                       help="Signature snapshot from swaig_cli --export-signatures; startup fails if it does not match")
+    serve.add_argument("--log-level", default="INFO", help="Logging level (default: INFO)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=args.log_level.upper(), format="[%(process)d] %(levelname)s %(message)s")
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    sys.path.insert(0, os.getcwd())
+    Arbiter(args.target, bind=args.bind, workers=args.workers, reuse_port=args.reuse_port,
+            max_requests=args.max_requests, max_requests_jitter=args.max_requests_jitter,
+            graceful_timeout=args.graceful_timeout, public_url=args.public_url,
+            signatures=args.signatures).run()
+
+if __name__ == "__main__":
+    main()
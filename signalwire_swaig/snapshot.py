@@ -0,0 +1,72 @@
+from typing import TYPE_CHECKING, Any, Dict, List, Union
+import json
+import os
+
+if TYPE_CHECKING:
+    from .swaig import SWAIG
+
+SNAPSHOT_FORMAT = "signalwire-swaig-signatures"
+SNAPSHOT_VERSION = 1
+
+class SignatureSnapshotError(ValueError):
+    """A signature snapshot does not match the registered handlers; ``problems`` lists each difference."""
+
+    def __init__(self, problems: List[str]):
+        super().__init__("Signature snapshot does not match the registered functions: " + "; ".join(problems))
+        self.problems = problems
+
+def build_snapshot(swaig: "SWAIG") -> Dict[str, Any]:
+    """The compiled signature catalog of ``swaig`` and its registries, without web_hook_url or credentials."""
+    registries = {"": _entries(swaig)}
+    for name, registry in swaig.registries.items():
+        registries[name] = _entries(registry)
+    return {"format": SNAPSHOT_FORMAT, "version": SNAPSHOT_VERSION, "registries": registries}
+
+def _entries(registry: "SWAIG") -> List[Dict[str, Any]]:
+    return [{"function": name, "digest": function.digest.hex(), "signature": function.to_dict()}
+            for name, function in registry.functions.items()]
+
+def compare_snapshot(swaig: "SWAIG", snapshot: Dict[str, Any]) -> List[str]:
+    """List the differences between ``snapshot`` and the registered functions; empty when they match."""
+    if not _well_formed(snapshot):
+        return [f"not a version {SNAPSHOT_VERSION} signature snapshot"]
+    snapshot_registries = snapshot["registries"]
+    problems = []
+    for name, registry in (("", swaig), *swaig.registries.items()):
+        prefix = f"{name}/" if name else ""
+        if name not in snapshot_registries:
+            problems.append(f"registry '{name}' is not in the snapshot")
+            continue
+        entries = snapshot_registries[name]
+        digests = {entry.get("function"): entry.get("digest") for entry in entries}
+        changed = []
+        for function_name, function in registry.functions.items():
+            digest = digests.pop(function_name, None)
+            if digest is None:
+                changed.append(f"{prefix}{function_name} is not in the snapshot")
+            elif digest != function.digest.hex():
+                changed.append(f"{prefix}{function_name} changed since the snapshot was taken")
+        changed.extend(f"{prefix}{function_name} is in the snapshot but not registered" for function_name in digests)
+        if not changed and [entry.get("function") for entry in entries] != list(registry.functions):
+            # Same signatures in another order would still change the body and its ETag.
+            changed.append(f"registry '{name}' lists its functions in a different order")
+        problems.extend(changed)
+    problems.extend(f"registry '{name}' is in the snapshot but not registered"
+                    for name in snapshot_registries if name and name not in swaig.registries)
+    return problems
+
+def _well_formed(snapshot: Any) -> bool:
+    if not isinstance(snapshot, dict) or snapshot.get("format") != SNAPSHOT_FORMAT \
+            or snapshot.get("version") != SNAPSHOT_VERSION or not isinstance(snapshot.get("registries"), dict):
+        return False
+    return all(isinstance(entries, list) and all(isinstance(entry, dict) for entry in entries)
+               for entries in snapshot["registries"].values())
+
+def read_snapshot(path: Union[str, "os.PathLike[str]"]) -> Dict[str, Any]:
+    with open(path, "rb") as f:
+        return json.loads(f.read())
+
+def write_snapshot(snapshot: Dict[str, Any], path: Union[str, "os.PathLike[str]"]):
+    with open(path, "w") as f:
+        json.dump(snapshot, f, indent=2)
+        f.write("\n")
@@ -0,0 +1,133 @@
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+import threading
+import time
+from .codec import JSONCodec, get_codec
+
+_MISSING = object()
+
+class MetaDataStore(ABC):
+    """Per-conversation state keyed by ``meta_data_token``.
+
+    Implementations must be safe to call from several threads at once.
+    """
+
+    @abstractmethod
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        ...
+
+    @abstractmethod
+    def set(self, token: str, data: Dict[str, Any]) -> None:
+        ...
+
+    @abstractmethod
+    def delete(self, token: str) -> None:
+        ...
+
+class MemoryMetaDataStore(MetaDataStore):
+    """In-process store with least-recently-used eviction and a time-to-live per entry."""
+
+    def __init__(self, max_entries: int = 10000, ttl: Optional[float] = 3600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                return None
+            expires, data = entry
+            if expires and expires < time.monotonic():
+                del self._entries[token]
+                return None
+            self._entries.move_to_end(token)
+            return data
+
+    def set(self, token: str, data: Dict[str, Any]) -> None:
+        expires = time.monotonic() + self.ttl if self.ttl else 0
+        with self._lock:
+            self._entries[token] = (expires, data)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, token: str) -> None:
+        with self._lock:
+            self._entries.pop(token, None)
+
+    def __len__(self):
+        return len(self._entries)
+
+class RedisMetaDataStore(MetaDataStore):
+    """Store backed by a redis-py compatible client (``get``, ``set(..., ex=)``, ``delete``)."""
+
+    def __init__(self, client, prefix: str = "swaig:meta:", ttl: Optional[int] = 3600, codec: Optional[JSONCodec] = None):
+        self.client = client
+        self.prefix = prefix
+        self.ttl = ttl
+        self.codec = codec or get_codec()
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        raw = self.client.get(self.prefix + token)
+        return self.codec.loads(raw) if raw is not None else None
+
+    def set(self, token: str, data: Dict[str, Any]) -> None:
+        self.client.set(self.prefix + token, self.codec.dumps(data), ex=self.ttl)
+
+    def delete(self, token: str) -> None:
+        self.client.delete(self.prefix + token)
+
+class SWAIGState(dict):
+    """Conversation state handed to handlers; remembers which keys were set or removed."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._set = set()
+        self._unset = set()
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self._set.add(key)
+        self._unset.discard(key)
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._set.discard(key)
+        self._unset.add(key)
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def pop(self, key, default=_MISSING):
+        if key in self:
+            value = self[key]
+            del self[key]
+            return value
+        if default is _MISSING:
+            raise KeyError(key)
+        return default
+
+    def popitem(self):
+        key = next(reversed(self))
+        return key, self.pop(key)
+
+    def clear(self):
+        for key in list(self):
+            del self[key]
+
+    @property
+    def changed(self) -> bool:
+        return bool(self._set or self._unset)
+
+    def changes(self) -> tuple[Dict[str, Any], list]:
+        """Return the keys set (with their values) and the keys removed since creation."""
+        return {key: self[key] for key in self._set}, sorted(self._unset, key=str)
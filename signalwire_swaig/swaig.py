@@ -1,39 +1,46 @@
-from flask import Flask, request, jsonify
-from flask_httpauth import HTTPBasicAuth
-from urllib.parse import urlsplit, urlunsplit
-from typing import Dict, Any, Callable, Optional, List
-from dataclasses import dataclass
-import logging
+from urllib.parse import quote, urlsplit, urlunsplit
+from typing import TYPE_CHECKING, Dict, Any, Callable, Optional, List, Tuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, TimeoutError as FutureTimeoutError, wait
+import asyncio
+import contextvars
+import copy
+import hashlib
+import inspect
 import os
+import time
+from .admission import AdmissionController
+from .auth import AuthSpec, AuthVerifier, make_verifier
+from .cache import SWAIGCache
+from .codec import JSONCodec, get_codec
+from .context import SWAIGRequestContext, _current_context, current_context
+from .deferred import DeferredExecutor, DeferredQueueFull
+from .envelope import EnvelopeDecoder
+from .errors import SWAIGError, SWAIGValidationError
+from .instrumentation import PayloadLogPolicy, logger
+from .metrics import SWAIGMetrics
+from .outbound import HTTPClient
 from .response import SWAIGResponse
+from .schema import CompiledFunction, SchemaCompiler, SWAIGArgument, SWAIGArgumentItems, SWAIGFunctionProperties
+from .snapshot import SignatureSnapshotError, build_snapshot, compare_snapshot, read_snapshot, write_snapshot
+from .store import MemoryMetaDataStore, MetaDataStore
+from .tracing import NULL_TRACE, RequestTrace, _current_trace, current_trace
+from .validation import compile_validator
 
-log_level = os.getenv('LOG_LEVEL', 'DEBUG').upper()
-logging.basicConfig(level=getattr(logging, log_level, logging.DEBUG))
-
-@dataclass
-class SWAIGArgumentItems:
-    type: str
-    enum: Optional[List[str]] = None
-    properties: Optional[Dict[str, 'SWAIGArgument']] = None
-    required: Optional[List[str]] = None
-    items: Optional['SWAIGArgumentItems'] = None
-
-@dataclass
-class SWAIGArgument:
-    type: str
-    description: str
-    required: bool = False
-    default: Optional[Any] = None
-    enum: Optional[List[str]] = None
-    items: Optional[SWAIGArgumentItems] = None
-
-@dataclass
-class SWAIGFunctionProperties:
-    active: Optional[bool] = None
-    wait_file: Optional[str] = None
-    wait_file_loops: Optional[int | str] = None
-    wait_for_fillers: Optional[bool] = None
-    fillers: Optional[Dict[str, List[str]]] = None
+if TYPE_CHECKING:
+    from flask import Flask, Response
+
+# Upper bound on distinct (host, requested functions) signature bodies kept in memory.
+SIGNATURE_CACHE_SIZE = 256
+# Streamed signature responses are flushed in chunks of roughly this many bytes.
+SIGNATURE_CHUNK_SIZE = 64 * 1024
+# Larger request bodies are refused with 413 before they are read.
+DEFAULT_MAX_BODY_SIZE = 16 * 1024 * 1024
+# Threads shared by batched calls and, in AsyncSWAIG, sync handlers.
+DEFAULT_MAX_WORKERS = 32
+# Calls from one batch request that may run at the same time.
+DEFAULT_BATCH_CONCURRENCY = 8
+# Spoken when a handler misses its deadline and no fallback was configured.
+DEFAULT_TIMEOUT_RESPONSE = "Sorry, that is taking longer than expected. Please try again in a moment."
 
 def build_schema(param):
     """Recursively build a JSON schema from SWAIGArgument or SWAIGArgumentItems."""
@@ -61,145 +68,833 @@ def remove_none(d):
     else:
         return d
 
+def endpoint_option(params: Dict[str, Any], name: str, default: Any = None) -> Any:
+    """Pop an endpoint() option from the keyword arguments.
+
+    Options share the keyword namespace with function arguments, so only values
+    that are not SWAIGArgument instances are treated as options.
+    """
+    if name in params and not isinstance(params[name], SWAIGArgument):
+        return params.pop(name)
+    return default
+
+def error_dict(message) -> Dict[str, Any]:
+    """Helper to build the SWAIG error response body."""
+    return SWAIGResponse(message).to_dict()
+
 def error_response(message):
     """Helper to return a JSON error response."""
-    swaigresp = SWAIGResponse(message)
-    return jsonify(swaigresp.to_dict()), 200
+    from flask import jsonify
+    return jsonify(error_dict(message)), 200
 
 class SWAIG:
-    def __init__(self, app: Flask = None, auth: Optional[tuple[str, str]] = None):
+    def __init__(self, app: "Flask" = None, auth: AuthSpec = None, log_policy: Optional[PayloadLogPolicy] = None,
+                 codec: Optional[JSONCodec] = None, meta_data_store: Optional[MetaDataStore] = None,
+                 max_workers: int = DEFAULT_MAX_WORKERS, batch_concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+                 batch_timeout: Optional[float] = None, default_timeout: Optional[float] = None,
+                 timeout_response: Any = DEFAULT_TIMEOUT_RESPONSE, cancel_on_timeout: bool = False,
+                 metrics_path: Optional[str] = None, registry_field: str = "registry", stream_signatures: bool = False,
+                 deferred: Optional[DeferredExecutor] = None, http: Optional[HTTPClient] = None,
+                 max_body_size: Optional[int] = DEFAULT_MAX_BODY_SIZE, lazy_request: bool = False,
+                 admission: Optional[AdmissionController] = None, tracer: Any = None, server_timing: bool = False,
+                 public_url: Optional[str] = None):
         self.app = None
-        self.auth = HTTPBasicAuth() if auth else None
-        self.functions: Dict[str, Dict[str, Any]] = {}
-        self.auth_creds = auth
-        self.function_objects: Dict[str, Callable] = {}
+        self.log_policy = log_policy or PayloadLogPolicy()
+        self.codec = codec or get_codec()
+        # Shared with registries so equal sub-schemas are stored once across all of them.
+        self.schema_compiler = SchemaCompiler(self.codec.dumps)
+        self.meta_data_store = meta_data_store if meta_data_store is not None else MemoryMetaDataStore()
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="swaig")
+        # Handlers with a deadline get their own pool: batch entries wait on them from
+        # the worker pool, so sharing it would queue the handlers behind their own callers.
+        self.deadline_executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="swaig-deadline")
+        self.batch_concurrency = batch_concurrency
+        self.batch_timeout = batch_timeout
+        self.default_timeout = default_timeout
+        self.timeout_response = timeout_response
+        self.cancel_on_timeout = cancel_on_timeout
+        self.metrics = SWAIGMetrics()
+        self.deferred = deferred or DeferredExecutor()
+        self.deferred.bind_metrics(self.metrics)
+        self.http = http or HTTPClient()
+        self.http.bind_metrics(self.metrics)
+        self.admission = admission or AdmissionController()
+        self.admission.bind_metrics(self.metrics)
+        self.tracer = tracer
+        self.server_timing = server_timing
+        self._before_call: List[Callable] = []
+        self._after_call: List[Callable] = []
+        self.metrics_path = metrics_path
+        self.registry_field = registry_field
+        self.stream_signatures = stream_signatures
+        self.max_body_size = max_body_size
+        # Signatures point at this URL whatever Host the request used, so host aliases share one cached body.
+        self.public_url = public_url.rstrip("/") + "/" if public_url else None
+        self._decode = self.codec.loads
+        if lazy_request:
+            try:
+                self._decode = EnvelopeDecoder(self.codec.loads, registry_field)
+            except ImportError:
+                logger.warning("lazy_request needs msgspec (pip install msgspec); decoding whole request bodies")
+        self._mounts: Dict[str, "SWAIG"] = {}
+        # Instance whose auth a registry without auth of its own uses.
+        self._auth_parent: Optional["SWAIG"] = None
+        self._init_registry(auth)
+        self.name: Optional[str] = None
+        self._label_prefix = ""
+        self._hook_path = "/swaig"
         if app is not None:
             self.init_app(app)
 
-    def init_app(self, app: Flask):
+    def _init_registry(self, auth: AuthSpec):
+        """Set up the per-registry state: functions, signatures, auth and caches."""
+        self.auth: Optional[AuthVerifier] = None
+        self.auth_creds: Optional[Tuple[str, str]] = None
+        self.functions: Dict[str, CompiledFunction] = {}
+        self.function_objects: Dict[str, Callable] = {}
+        self.registries: Dict[str, "SWAIG"] = {}
+        self._signature_order: Dict[str, int] = {}
+        self._validators: Dict[str, Callable[[Dict[str, Any]], Dict[str, Any]]] = {}
+        self._context_handlers: set = set()
+        self._caches: Dict[str, SWAIGCache] = {}
+        self._timeouts: Dict[str, Tuple[Optional[float], Any]] = {}
+        self._signature_cache: Dict[Tuple[str, Optional[frozenset]], Tuple[bytes, str]] = {}
+        self._base_urls: Dict[str, str] = {}
+        self.set_auth(auth)
+
+    def init_app(self, app: "Flask"):
         self.app = app
+        app.extensions["swaig"] = self
         self._setup_routes()
 
+    def _too_large(self) -> "Response":
+        self.metrics.errors.inc("too_large")
+        return self._json_response({"error": "Request body too large"}, 413)
+
+    def registry(self, name: str, path: Optional[str] = None, auth: AuthSpec = None,
+                 inherit_auth: bool = True) -> "SWAIG":
+        """Create a named function registry served by this instance, e.g. one per agent.
+
+        The registry has its own functions, auth and signature cache, and shares
+        the worker pool, codec, meta_data store and metrics with this instance.
+        Mount it at ``path`` or select it per request with the ``registry_field``
+        body field or query parameter; its signatures point SignalWire back at
+        the same registry. A registry without auth of its own uses (and
+        advertises) this instance's, including after set_auth; pass
+        ``inherit_auth=False`` to serve a mounted registry without auth. A
+        request reaching a registry through the selector is always checked
+        against the registry's auth if it has one, else this instance's.
+
+            sales = swaig.registry("sales", path="/agents/sales/swaig", auth=("sales", "secret"))
+
+            @sales.endpoint("Look up a quote", sku=SWAIGArgument("string", "Product SKU"))
+            def get_quote(sku, meta_data=None, meta_data_token=None): ...
+        """
+        if self.name is not None:
+            raise ValueError("Registries cannot be nested")
+        if name in self.registries:
+            raise ValueError(f"Registry '{name}' already exists")
+        if path is not None and (path == self._hook_path or path in self._mounts):
+            raise ValueError(f"Path '{path}' is already mounted")
+        registry = copy.copy(self)
+        registry._auth_parent = self if inherit_auth else None
+        registry._init_registry(auth)
+        registry._mounts = {}
+        registry.name = name
+        registry._label_prefix = f"{name}/"
+        registry._hook_path = path or f"{self._hook_path}?{self.registry_field}={quote(name)}"
+        self.registries[name] = registry
+        if path is not None:
+            self._mounts[path] = registry
+            if self.app is not None:
+                registry._add_route(path, f"swaig_registry_{name}")
+        return registry
+
+    def _select_registry(self, data: Dict[str, Any], selector: Optional[str] = None) -> Optional["SWAIG"]:
+        """Return the registry a request addresses: this one, a named one, or None for an unknown name."""
+        name = data.get(self.registry_field, selector)
+        if name is None:
+            return self
+        return self.registries.get(name) if isinstance(name, str) else None
+
+    def set_auth(self, auth: AuthSpec):
+        """Replace the request verifier: a (username, password) pair, a list of pairs or an AuthVerifier.
+
+        Use this to rotate credentials; cached web_hook_urls are rebuilt with the new primary credentials.
+        """
+        self._own_auth = make_verifier(auth)
+        self._refresh_auth()
+        for registry in self.registries.values():
+            if registry._auth_parent is self:
+                registry._refresh_auth()
+
+    def set_public_url(self, public_url: Optional[str]):
+        """Point the signatures of this SWAIG and its registries at ``public_url``, whatever Host requests use."""
+        public_url = public_url.rstrip("/") + "/" if public_url else None
+        for registry in (self, *self.registries.values()):
+            registry.public_url = public_url
+            registry._signature_cache.clear()
+
+    def _refresh_auth(self):
+        verifier = self._own_auth
+        if verifier is None and self._auth_parent is not None:
+            verifier = self._auth_parent.auth
+        self.auth = verifier
+        self.auth_creds = verifier.credentials if verifier is not None else None
+        self._base_urls.clear()
+        self._signature_cache.clear()
+
+    def _auth_owner(self, target: "SWAIG") -> "SWAIG":
+        """The instance whose auth guards requests this instance routes to ``target``: the target's own, else this one's."""
+        return target if target.auth is not None else self
+
+    def _early_auth_owner(self, selector: Optional[str]) -> Optional["SWAIG"]:
+        """The instance whose auth can be checked before the body is parsed, or None when only the body tells.
+
+        That is the owner of the registry named by the query ``selector``, or
+        this instance when no registry has a verifier of its own. A body field
+        selecting another registry is checked again once the body is parsed.
+        """
+        if selector in self.registries:
+            return self._auth_owner(self.registries[selector])
+        if all(registry.auth is None or registry.auth is self.auth for registry in self.registries.values()):
+            return self
+        return None
+
+    def _unauthorized(self) -> "Response":
+        self.metrics.errors.inc("unauthorized")
+        response = self._json_response({"error": "Unauthorized"}, 401)
+        if self.auth.challenge:
+            response.headers["WWW-Authenticate"] = self.auth.challenge
+        return response
+
     def endpoint(self, description: str, function_properties: Optional[SWAIGFunctionProperties] = None, **params: SWAIGArgument):
+        """Register a SWAIG function.
+
+        Keyword arguments that are SWAIGArgument instances describe the function's
+        parameters. Any other keyword is an endpoint option:
+
+        - ``validate`` (default True): check and coerce arguments against the schema
+          before the handler runs.
+        - ``context`` (default False): call the handler with a single
+          SWAIGRequestContext instead of keyword arguments.
+        - ``cache``: a SWAIGCache memoizing responses on the parsed arguments.
+        - ``timeout``: seconds the handler may run before ``fallback`` (a
+          SWAIGResponse, string or tuple) is returned instead; defaults to the
+          SWAIG ``default_timeout`` and ``timeout_response``.
+        - ``rate_limit``: ``(calls per second, burst)`` for this function,
+          overriding the admission controller's ``per_function`` limit.
+        """
+        validate = endpoint_option(params, "validate", True)
+        pass_context = endpoint_option(params, "context", False)
+        cache = endpoint_option(params, "cache")
+        timeout = endpoint_option(params, "timeout")
+        fallback = endpoint_option(params, "fallback")
+        rate_limit = endpoint_option(params, "rate_limit")
         def decorator(func: Callable):
-            func_meta = {
-                "description": description,
-                "function": func.__name__,
-            }
-            if function_properties:
-                func_meta.update(function_properties.__dict__)
-            func_meta["parameters"] = {
-                "type": "object",
-                "properties": {name: build_schema(param) for name, param in params.items()},
-                "required": [name for name, param in params.items() if param.required]
-            }
-            self.functions[func.__name__] = func_meta
+            self.functions[func.__name__] = self.schema_compiler.function(func.__name__, description, function_properties, params)
+            self._signature_order.setdefault(func.__name__, len(self._signature_order))
             self.function_objects[func.__name__] = func
+            if validate:
+                self._validators[func.__name__] = compile_validator(params)
+            else:
+                self._validators.pop(func.__name__, None)
+            if pass_context:
+                self._context_handlers.add(func.__name__)
+            else:
+                self._context_handlers.discard(func.__name__)
+            if cache is not None:
+                self._caches[func.__name__] = cache
+                self.metrics.caches[self._label_prefix + func.__name__] = cache
+            else:
+                self._caches.pop(func.__name__, None)
+                self.metrics.caches.pop(self._label_prefix + func.__name__, None)
+            if timeout is not None or fallback is not None:
+                self._timeouts[func.__name__] = (timeout, fallback)
+            else:
+                self._timeouts.pop(func.__name__, None)
+            self.admission.limit_function(self._label_prefix + func.__name__, rate_limit)
+            self._signature_cache.clear()
+            logger.debug("Registering endpoint: %s", func.__name__)
+            if pass_context:
+                return func
 
             def wrapper(*args, **kwargs):
-                meta_data = request.json.get('meta_data', {})
-                meta_data_token = request.json.get('meta_data_token', None)
-                if not isinstance(meta_data, dict):
-                    return error_response("Invalid meta_data format. It should be a dictionary.")
-                if meta_data_token is not None and not isinstance(meta_data_token, str):
-                    return error_response("Invalid meta_data_token format. It should be a string.")
-                return func(*args, meta_data=meta_data, meta_data_token=meta_data_token, **kwargs)
-            logging.debug(f"Registering endpoint: {func.__name__}")
+                # Direct calls made while a SWAIG call is being handled pick up its meta_data.
+                ctx = current_context()
+                kwargs.setdefault("meta_data", dict(ctx.meta_data) if ctx else {})
+                kwargs.setdefault("meta_data_token", ctx.meta_data_token if ctx else None)
+                return func(*args, **kwargs)
             return wrapper
         return decorator
 
     def _setup_routes(self):
         if not self.app:
             raise RuntimeError("App not set for SWAIG")
+        self._add_route('/swaig', 'route_handler')
+        for path, registry in self._mounts.items():
+            registry.app = self.app
+            registry._add_route(path, f"swaig_registry_{registry.name}")
+        if self.metrics_path:
+            self.app.add_url_rule(self.metrics_path, 'swaig_metrics', self._handle_metrics_request, methods=['GET'])
+
+    def _add_route(self, path: str, endpoint: str):
+        from flask import request
+
+        def handle(trace) -> Tuple[str, "Response"]:
+            with trace.stage("read"):
+                limit = self.max_body_size
+                if limit is not None and (request.content_length or 0) > limit:
+                    return "invalid", self._too_large()
+                body = request.get_data() if limit is None or request.content_length is not None else request.stream.read(limit + 1)
+                if limit is not None and len(body) > limit:
+                    return "invalid", self._too_large()
+            selector = request.args.get(self.registry_field) if self.registries else None
+            checked = None
+            early = self._early_auth_owner(selector)
+            if early is not None and early.auth is not None:
+                with trace.stage("auth"):
+                    if not early.auth.verify(request.headers, body):
+                        return "invalid", early._unauthorized()
+                checked = early.auth
+            try:
+                with trace.stage("parse"):
+                    data = self._decode(body)
+            except ValueError:
+                self.metrics.errors.inc("bad_request")
+                return "invalid", self._json_response({"error": "Invalid JSON body"}, 400)
+            if not isinstance(data, dict):
+                self.metrics.errors.inc("bad_request")
+                return "invalid", self._json_response({"error": "Request body must be a JSON object"}, 400)
+            target = self
+            if self.registries:
+                target = self._select_registry(data, selector)
+                owner = self._auth_owner(target or self)
+                if owner.auth is not None and owner.auth is not checked:
+                    with trace.stage("auth"):
+                        if not owner.auth.verify(request.headers, body):
+                            return "invalid", owner._unauthorized()
+                if target is None:
+                    self.metrics.errors.inc("not_found")
+                    return "invalid", self._json_response({"error": "Unknown registry"}, 404)
+            if self.log_policy.enabled():
+                logger.debug("Request data: %s", self.log_policy.render(data))
+            action = self._action(data)
+            trace.tag("action", action)
+            if action == "get_signature":
+                logger.debug("Action is get_signature")
+                with trace.stage("signatures"):
+                    return action, target._handle_signature_request(data)
+            if action == "batch":
+                logger.debug("Action is batch")
+                return action, target._json_response(target._handle_batch(data))
+            logger.debug("Action is function call")
+            return action, target._handle_function_call(data)
+
         def route_handler():
-            logging.debug("Handling request at /swaig endpoint")
-            data = request.json
-            logging.debug(f"Request data: {data}")
-            if data.get('action') == "get_signature":
-                logging.debug("Action is get_signature")
-                return self._handle_signature_request(data)
-            logging.debug("Action is function call")
-            return self._handle_function_call(data)
-        if self.auth:
-            route_handler = self.auth.verify_password(route_handler)
-        self.app.route('/swaig', methods=['POST'])(route_handler)
+            logger.debug("Handling request at %s endpoint", path)
+            started = time.perf_counter()
+            action = "invalid"
+            self.metrics.in_flight.inc()
+            trace = self._start_trace()
+            token = _current_trace.set(trace) if trace.enabled else None
+            try:
+                action, response = handle(trace)
+                if trace.enabled:
+                    trace.finish()
+                    response.headers["Server-Timing"] = trace.server_timing()
+                return response
+            finally:
+                if token is not None:
+                    trace.finish()
+                    _current_trace.reset(token)
+                self.metrics.in_flight.dec()
+                self.metrics.requests.inc(action)
+                self.metrics.request_latency.observe(action, value=time.perf_counter() - started)
+        self.app.add_url_rule(path, endpoint, route_handler, methods=['POST'])
+
+    def _start_trace(self):
+        """A RequestTrace for a new request, or the shared no-op trace when tracing is off."""
+        if self.tracer is None and not self.server_timing:
+            return NULL_TRACE
+        return RequestTrace(self.tracer)
+
+    def before_call(self, func: Callable) -> Callable:
+        """Register ``func(ctx)`` to run before every function call, after arguments are validated.
+
+        A hook returning anything but None short-circuits the call: the value is
+        rendered as if the handler had returned it. On AsyncSWAIG hooks may be
+        coroutine functions. Hooks apply to all registries.
+        """
+        self._before_call.append(func)
+        return func
+
+    def after_call(self, func: Callable) -> Callable:
+        """Register ``func(ctx, body)`` to run after every function call; a non-None return replaces the response body."""
+        self._after_call.append(func)
+        return func
+
+    @staticmethod
+    def _action(data) -> str:
+        action = data.get('action')
+        return action if action in ("get_signature", "batch") else "function_call"
+
+    def _handle_metrics_request(self):
+        from flask import Response
+        return Response(self.metrics.render(), mimetype=self.metrics.content_type)
 
     def _handle_signature_request(self, data):
-        logging.debug(f"Handling signature request with data: {data}")
-        requested = data.get("functions") or list(self.functions.keys())
-        logging.debug(f"Requested function signatures: {requested}")
-        base_url = self._get_base_url()
-        signatures = []
-        for name in requested:
-            if name in self.functions:
-                func_info = self.functions[name].copy()
-                func_info["web_hook_url"] = f"{base_url}/swaig"
-                signatures.append(remove_none(func_info))
-        logging.debug(f"Signature request handled, returning signatures: {signatures}")
-        return jsonify(signatures)
+        from flask import Response, request
+        logger.debug("Handling signature request")
+        host_url = self._signature_host(request.host_url)
+        if self.stream_signatures:
+            names, etag = self._signature_stream(host_url, data.get("functions"))
+        else:
+            body, etag = self._signature_body(host_url, data.get("functions"))
+        # Checked by hand: Response.make_conditional only honours If-None-Match on GET and HEAD.
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+        elif self.stream_signatures:
+            response = Response(self._iter_signatures(host_url, names), mimetype="application/json")
+        else:
+            response = Response(body, mimetype="application/json")
+        response.set_etag(etag)
+        return response
+
+    def _signature_host(self, host_url: str) -> str:
+        """The host signatures are built for: ``public_url`` when set, else the request's own.
+
+        web_hook_urls are always https, so the scheme is normalized and a host
+        reached over http or https shares one cached body.
+        """
+        if self.public_url is not None:
+            return self.public_url
+        return f"https://{host_url.split('://', 1)[-1].rstrip('/')}/"
+
+    @staticmethod
+    def _signature_filter(requested: Any) -> Optional[frozenset]:
+        """Normalize the request's ``functions`` list into a set of names; None selects every function."""
+        if not requested:
+            return None
+        if isinstance(requested, str):
+            requested = [requested]
+        return frozenset(name for name in requested if isinstance(name, str))
+
+    def _signature_names(self, wanted: Optional[frozenset]) -> List[str]:
+        """Selected function names, in registration order."""
+        if wanted is None:
+            return list(self.functions)
+        return sorted((name for name in wanted if name in self.functions), key=self._signature_order.__getitem__)
+
+    def _signature_etag(self, host_url: str, names: List[str]) -> str:
+        """ETag derived from the web_hook_url and per-function digests, so it is known before the body is produced."""
+        web_hook_url = self._get_base_url(host_url) + self._hook_path
+        etag = hashlib.blake2b(web_hook_url.encode("utf-8"), digest_size=16)
+        for name in names:
+            etag.update(self.functions[name].digest)
+        return etag.hexdigest()
+
+    def _signature_body(self, host_url: str, requested: Any) -> Tuple[bytes, str]:
+        """Return the cached serialized signatures and ETag for a host and requested function set."""
+        key = (host_url, self._signature_filter(requested))
+        cached = self._signature_cache.get(key)
+        if cached is None:
+            cached = self._build_signatures(host_url, key[1])
+            if len(self._signature_cache) >= SIGNATURE_CACHE_SIZE:
+                self._signature_cache.clear()
+            self._signature_cache[key] = cached
+        logger.debug("Signature request handled, returning %d bytes (etag %s)", len(cached[0]), cached[1])
+        return cached
+
+    def _build_signatures(self, host_url: str, wanted: Optional[frozenset]) -> Tuple[bytes, str]:
+        """Serialize the signatures for a host once; served as raw bytes afterwards."""
+        logger.debug("Building signatures for %s, requested functions: %s", host_url, wanted)
+        names = self._signature_names(wanted)
+        return b"".join(self._iter_signatures(host_url, names)), self._signature_etag(host_url, names)
+
+    def _signature_stream(self, host_url: str, requested: Any) -> Tuple[List[str], str]:
+        """Names and ETag for a streamed signature response; nothing is serialized up front."""
+        names = self._signature_names(self._signature_filter(requested))
+        return names, self._signature_etag(host_url, names)
+
+    def _iter_signatures(self, host_url: str, names: List[str]):
+        """Yield the JSON signature array in chunks built from the compiled, pre-serialized signatures."""
+        suffix = b',"web_hook_url":' + self.codec.dumps(f"{self._get_base_url(host_url)}{self._hook_path}") + b"}"
+        chunk = bytearray(b"[")
+        for index, name in enumerate(names):
+            if index:
+                chunk += b","
+            function = self.functions[name]
+            chunk += function.head
+            chunk += function.parameters.json
+            chunk += suffix
+            if len(chunk) >= SIGNATURE_CHUNK_SIZE:
+                yield bytes(chunk)
+                chunk.clear()
+        chunk += b"]"
+        yield bytes(chunk)
 
     def _handle_function_call(self, data):
-        logging.debug(f"Handling function call with data: {data}")
+        logger.debug("Handling function call")
+        try:
+            body = self._dispatch(data)
+        except Exception as e:
+            body = self._render_exception(data.get('function'), e)
+        return self._json_response(body)
+
+    def _dispatch(self, data) -> Dict[str, Any]:
+        """Run one function call and return its response body; errors propagate to the caller."""
+        function, token = self._admission_key(data)
+        reason = self.admission.check(function, token)
+        if reason is None:
+            reason = self.admission.acquire()
+            if reason is None:
+                try:
+                    return self._run_call(data)
+                finally:
+                    self.admission.release()
+        return self._shed(reason, function)
+
+    def _admission_key(self, data) -> Tuple[Optional[str], Any]:
+        """Function label (None for unknown functions) and token the admission controller limits on."""
+        function = data.get('function')
+        known = isinstance(function, str) and function in self.function_objects
+        return (self._label_prefix + function if known else None), data.get('meta_data_token')
+
+    def _shed(self, reason: str, function: Optional[str]) -> Dict[str, Any]:
+        logger.debug("Shed call to %s: %s", function, reason)
+        self.admission.shed(reason, function)
+        return self._render_result(function, self.admission.retry_response)
+
+    def _run_call(self, data) -> Dict[str, Any]:
+        trace = current_trace()
+        with trace.stage("prepare"):
+            ctx = self._prepare_call(data)
+        trace.tag("function", ctx.function)
+        trace.tag("meta_data_token", ctx.meta_data_token)
+        token = _current_context.set(ctx)
+        started = self._call_started(ctx)
+        try:
+            body = None
+            for hook in self._before_call:
+                result = hook(ctx)
+                if result is not None:
+                    body = self._render_result(ctx.function, result)
+                    break
+            if body is None:
+                with trace.stage("handler"):
+                    body = self._call_handler(ctx)
+            for hook in self._after_call:
+                replaced = hook(ctx, body)
+                if replaced is not None:
+                    body = replaced
+            return body
+        finally:
+            self._call_finished(ctx, started)
+            _current_context.reset(token)
+
+    def _call_handler(self, ctx: SWAIGRequestContext) -> Dict[str, Any]:
+        """Complete the call, giving up at the function's deadline if it has one."""
+        timeout = self._timeout_for(ctx.function)
+        if timeout is None:
+            return self._complete(ctx)
+        # Run on the deadline pool so this thread can give up waiting at the deadline.
+        future = self.deadline_executor.submit(contextvars.copy_context().run, self._complete, ctx)
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            if future.done():
+                raise
+            if self.cancel_on_timeout:
+                future.cancel()
+            return self._timeout_body(ctx)
+
+    def _call_started(self, ctx: SWAIGRequestContext) -> float:
+        self.metrics.calls.inc(self._label_prefix + ctx.function)
+        self.metrics.calls_in_flight.inc(self._label_prefix + ctx.function)
+        return time.perf_counter()
+
+    def _call_finished(self, ctx: SWAIGRequestContext, started: float):
+        self.metrics.calls_in_flight.dec(self._label_prefix + ctx.function)
+        self.metrics.call_latency.observe(self._label_prefix + ctx.function, value=time.perf_counter() - started)
+
+    def _complete(self, ctx: SWAIGRequestContext) -> Dict[str, Any]:
+        cache = self._caches.get(ctx.function)
+        if cache is not None:
+            body = cache.call(cache.make_key(ctx), lambda: self._execute(ctx))
+        else:
+            body = self._execute(ctx)
+        return self._apply_state(ctx, body)
+
+    def _timeout_for(self, function_name: str) -> Optional[float]:
+        timeout, _ = self._timeouts.get(function_name, (None, None))
+        return timeout if timeout is not None else self.default_timeout
+
+    def _timeout_body(self, ctx: SWAIGRequestContext) -> Dict[str, Any]:
+        """Response used when a handler misses its deadline."""
+        logger.warning("Function %s timed out after %ss", ctx.function, self._timeout_for(ctx.function))
+        self.metrics.errors.inc("timeout")
+        _, fallback = self._timeouts.get(ctx.function, (None, None))
+        return self._render_result(ctx.function, fallback if fallback is not None else self.timeout_response)
+
+    def _execute(self, ctx: SWAIGRequestContext) -> Dict[str, Any]:
+        result = self._invoke(ctx)
+        if inspect.iscoroutine(result):
+            result = asyncio.run(result)
+        return self._render_result(ctx.function, result)
+
+    def _handle_batch(self, data) -> Dict[str, Any]:
+        """Run the calls of a batch request on the worker pool, at most batch_concurrency at a time."""
+        calls = self._batch_calls(data)
+        if isinstance(calls, dict):
+            return calls
+        results: List[Optional[Dict[str, Any]]] = [None] * len(calls)
+        inflight = {}
+        pending = iter(enumerate(calls))
+        while True:
+            while len(inflight) < self.batch_concurrency:
+                index, call = next(pending, (None, None))
+                if index is None:
+                    break
+                future = self.executor.submit(contextvars.copy_context().run, self._batch_entry, call)
+                deadline = time.monotonic() + self.batch_timeout if self.batch_timeout else None
+                inflight[future] = (index, deadline)
+            if not inflight:
+                break
+            deadlines = [deadline for _, deadline in inflight.values() if deadline is not None]
+            timeout = max(0, min(deadlines) - time.monotonic()) if deadlines else None
+            done, _ = wait(inflight, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                index, _ = inflight.pop(future)
+                results[index] = future.result()
+            now = time.monotonic()
+            for future, (index, deadline) in list(inflight.items()):
+                if deadline is not None and deadline <= now:
+                    del inflight[future]
+                    future.cancel()
+                    self.metrics.errors.inc("timeout")
+                    results[index] = self._batch_error(calls[index], "Timed out")
+        return {"results": results}
+
+    def _batch_calls(self, data):
+        """Expand a batch request into function-call bodies, or return an error body."""
+        calls = data.get("calls")
+        if not isinstance(calls, list):
+            return error_dict("Invalid batch format. 'calls' should be a list.")
+        defaults = {key: data[key] for key in ("meta_data", "meta_data_token") if key in data}
+        return [{**defaults, **call} if isinstance(call, dict) else call for call in calls]
+
+    def _batch_entry(self, call) -> Dict[str, Any]:
+        if not isinstance(call, dict):
+            return self._batch_error(call, "Invalid call format. It should be an object.")
+        # Runs in its own copy of the request's context, so the call trace stays with this entry.
+        trace = current_trace().call()
+        if trace.enabled:
+            _current_trace.set(trace)
+        try:
+            return {"function": call.get("function"), **self._dispatch(call)}
+        except Exception as e:
+            return self._batch_error(call, self._render_exception(call.get("function"), e)["response"])
+        finally:
+            trace.finish()
+
+    @staticmethod
+    def _batch_error(call, message: str) -> Dict[str, Any]:
+        return {"function": call.get("function") if isinstance(call, dict) else None, "error": message}
+
+    def _json_response(self, body: Any, status: int = 200) -> "Response":
+        from flask import Response
+        with current_trace().stage("serialize"):
+            payload = self.codec.dumps(body)
+        return Response(payload, status=status, mimetype="application/json")
+
+    def _prepare_call(self, data) -> SWAIGRequestContext:
+        """Build the call context for a function call, raising SWAIGError for malformed calls."""
         function_name = data.get('function')
         if not function_name:
-            logging.error("Function name not provided")
-            return error_response("Function name not provided")
-        func = self.function_objects.get(function_name)
-        if not func:
-            logging.error(f"Function not found: {function_name}")
-            return error_response("Function not found")
+            logger.error("Function name not provided")
+            raise SWAIGError("Function name not provided", kind="bad_request")
+        if function_name not in self.function_objects:
+            logger.error("Function not found: %s", function_name)
+            raise SWAIGError("Function not found", kind="not_found")
         params = data.get('argument', {}).get('parsed', [{}])[0]
         meta_data = data.get('meta_data', {})
         meta_data_token = data.get('meta_data_token', None)
-        meta_data['fullrequest'] = data if isinstance(data, dict) else {}
-        logging.debug(f"Calling function: {function_name} with params: {params}, meta_data: {meta_data}, meta_data_token: {meta_data_token}")
-        
+
         # Validate meta_data is a dict
         if not isinstance(meta_data, dict):
-            return error_response("Invalid meta_data format. It should be a dictionary.")
-        
+            raise SWAIGError("Invalid meta_data format. It should be a dictionary.", kind="bad_args")
+        if self.log_policy.enabled():
+            logger.debug("Calling function: %s with params: %s, meta_data: %s, meta_data_token: %s",
+                         function_name, self.log_policy.render(params), self.log_policy.render(meta_data), meta_data_token)
+
         # Validate meta_data_token is a string or None
         if meta_data_token is not None and not isinstance(meta_data_token, str):
-            return error_response("Invalid meta_data_token format. It should be a string.")
-        
+            raise SWAIGError("Invalid meta_data_token format. It should be a string.", kind="bad_args")
+
         # Validate params is a dict
         if not isinstance(params, dict):
-            return error_response("Invalid parameters format")
-        
-        try:
-            # Copy params to avoid modifying the original
-            function_params = params.copy()
-            result = func(meta_data=meta_data, meta_data_token=meta_data_token, **function_params)
-            logging.debug(f"Function {function_name} returned: {result}")
-            
-            # Check if the result is already a SWAIGResponse
-            if isinstance(result, SWAIGResponse):
-                return jsonify(result.to_dict()), 200
-            
-            # Handle existing return formats (backward compatibility)
-            if isinstance(result, tuple):
-                if len(result) == 1:
-                    response, actions = result[0], None
-                elif len(result) == 2:
-                    response, actions = result
-                else:
-                    return error_response(f"Function '{function_name}' did not return a tuple of one or two elements")
-            else:
-                response, actions = result, None
-                
-            # Create response dictionary (legacy format)
-            if actions:
-                return jsonify({"response": response, "action": actions}), 200
+            raise SWAIGError("Invalid parameters format", kind="bad_args")
+
+        validator = self._validators.get(function_name)
+        if validator:
+            try:
+                params = validator(params)
+            except SWAIGValidationError as e:
+                e.function = function_name
+                logger.warning("%s", e)
+                raise
+
+        # With lazy_request the full body is a LazyRequest, decoded only if the handler reads it.
+        return SWAIGRequestContext(function_name, params, meta_data, meta_data_token, getattr(data, "full_request", data),
+                                   self.meta_data_store, self.http)
+
+    def _invoke(self, ctx: SWAIGRequestContext) -> Any:
+        """Call the handler for ctx; returns a coroutine for async handlers."""
+        func = self.function_objects[ctx.function]
+        if ctx.function in self._context_handlers:
+            return func(ctx)
+        # Keyword handlers still see the whole request as meta_data['fullrequest'], on a shallow
+        # copy so the request body never references itself.
+        meta_data = {**ctx.meta_data, "fullrequest": ctx._request}
+        return func(meta_data=meta_data, meta_data_token=ctx.meta_data_token, **ctx.args)
+
+    def _render_result(self, function_name: str, result: Any) -> Dict[str, Any]:
+        """Convert a handler's return value into the SWAIG response body."""
+        if self.log_policy.enabled():
+            logger.debug("Function %s returned: %s", function_name, self.log_policy.render(result))
+
+        # Check if the result is already a SWAIGResponse
+        if isinstance(result, SWAIGResponse):
+            for func, args, kwargs in result.deferred:
+                self._submit_deferred(func, args, kwargs)
+            return result.to_dict()
+
+        # Handle existing return formats (backward compatibility)
+        if isinstance(result, tuple):
+            if len(result) == 1:
+                response, actions = result[0], None
+            elif len(result) == 2:
+                response, actions = result
             else:
-                return jsonify({"response": response}), 200
-                
-        except TypeError as e:
-            return error_response(f"Invalid arguments for function '{function_name}': {str(e)}")
-        except Exception as e:
-            return error_response(str(e))
+                self.metrics.errors.inc("handler_exception")
+                return error_dict(f"Function '{function_name}' did not return a tuple of one or two elements")
+        else:
+            response, actions = result, None
+
+        # Create response dictionary (legacy format)
+        if actions:
+            return {"response": response, "action": actions}
+        return {"response": response}
+
+    def defer(self, func: Callable, *args: Any, **kwargs: Any):
+        """Queue ``func(*args, **kwargs)`` on the deferred executor and return its future.
+
+        Raises DeferredQueueFull when the queue stays full; SWAIGResponse.defer
+        logs and drops the task instead, so the caller still gets its answer.
+        """
+        return self.deferred.submit(func, *args, **kwargs)
+
+    def preload(self, host_url: Optional[str] = None):
+        """Build the full signature body of this SWAIG and its registries for ``host_url`` ahead of the first request.
+
+        ``public_url``, when set, takes the place of ``host_url``. Used by ``swaig serve`` before
+        forking, so workers share the cached bodies.
+        """
+        if host_url is None and self.public_url is None:
+            return
+        host_url = self._signature_host(host_url)
+        for registry in (self, *self.registries.values()):
+            registry._signature_body(host_url, None)
+
+    def export_signatures(self, path: Optional[str] = None) -> Dict[str, Any]:
+        """Return the compiled signature catalog of this SWAIG and its registries, writing it to ``path`` if given.
+
+        The snapshot holds each function's signature and digest, but no
+        web_hook_url or credentials. ``swaig_cli --app module:app
+        --export-signatures FILE`` produces the same file.
+        """
+        snapshot = build_snapshot(self)
+        if path is not None:
+            write_snapshot(snapshot, path)
+        return snapshot
+
+    def load_signatures(self, snapshot: Any, strict: bool = True, host_url: Optional[str] = None) -> List[str]:
+        """Check a snapshot (a path or the dict from export_signatures) against the registered functions.
+
+        When it matches, the signature bodies for ``public_url``, or else for
+        ``host_url`` (the host requests arrive at, over http or https), are
+        built right away, so get_signature is answered
+        from prebuilt bytes from the first request on. Otherwise raises
+        SignatureSnapshotError, or with ``strict=False`` logs the differences
+        and returns them.
+        """
+        if isinstance(snapshot, (str, os.PathLike)):
+            snapshot = read_snapshot(snapshot)
+        problems = compare_snapshot(self, snapshot)
+        if problems:
+            if strict:
+                raise SignatureSnapshotError(problems)
+            for problem in problems:
+                logger.warning("Signature snapshot: %s", problem)
+            return problems
+        if host_url is None and self.public_url is None:
+            logger.warning("Signature snapshot matches, but without public_url or host_url no signatures are prebuilt")
+        self.preload(host_url)
+        return problems
+
+    def shutdown(self, drain: bool = True, timeout: Optional[float] = None):
+        """Drain (or, without ``drain``, cancel) deferred tasks, then stop the shared executors and HTTP pool."""
+        self.deferred.shutdown(drain=drain, timeout=timeout)
+        self.executor.shutdown(wait=drain)
+        self.deadline_executor.shutdown(wait=drain)
+        self.http.close()
+
+    def _submit_deferred(self, func: Callable, args: tuple, kwargs: Dict[str, Any], block: bool = True):
+        try:
+            self.deferred.submit(func, *args, block=block, **kwargs)
+        except (DeferredQueueFull, RuntimeError) as e:
+            logger.warning("Dropped deferred task %s: %s", getattr(func, "__name__", func), e)
+
+    def _apply_state(self, ctx: SWAIGRequestContext, body: Dict[str, Any]) -> Dict[str, Any]:
+        """Persist state the handler changed and report it to SignalWire as meta_data actions."""
+        state = ctx._state
+        if state is None or not state.changed:
+            return body
+        if ctx.meta_data_token:
+            self.meta_data_store.set(ctx.meta_data_token, dict(state))
+        updated, removed = state.changes()
+        existing = body.get("action")
+        actions = list(existing) if isinstance(existing, list) else ([existing] if existing else [])
+        if updated:
+            actions.append({"set_meta_data": updated})
+        if removed:
+            actions.append({"unset_meta_data": removed})
+        return {**body, "action": actions}
+
+    def _render_exception(self, function_name: str, e: Exception) -> Dict[str, Any]:
+        if isinstance(e, SWAIGError):
+            self.metrics.errors.inc(e.kind)
+            return error_dict(str(e))
+        if isinstance(e, TypeError):
+            self.metrics.errors.inc("bad_args")
+            return error_dict(f"Invalid arguments for function '{function_name}': {str(e)}")
+        self.metrics.errors.inc("handler_exception")
+        return error_dict(str(e))
+
+    def _get_base_url(self, host_url: Optional[str] = None):
+        if host_url is None:
+            from flask import request
+            host_url = request.host_url
+        base_url = self._base_urls.get(host_url)
+        if base_url is None:
+            if len(self._base_urls) >= SIGNATURE_CACHE_SIZE:
+                self._base_urls.clear()
+            base_url = self._base_urls[host_url] = self._build_base_url(host_url)
+        return base_url
 
-    def _get_base_url(self):
-        url = urlsplit(request.host_url.rstrip('/'))
+    def _build_base_url(self, host_url: str) -> str:
+        url = urlsplit(host_url.rstrip('/'))
         if self.auth_creds:
             username, password = self.auth_creds
             netloc = f"{username}:{password}@{url.netloc}"
@@ -207,4 +902,4 @@ class SWAIG:
             netloc = url.netloc
         if url.scheme != 'https':
             url = url._replace(scheme='https')
-        return urlunsplit((url.scheme, netloc, url.path, url.query, url.fragment)) 
\ No newline at end of file
+        return urlunsplit((url.scheme, netloc, url.path, url.query, url.fragment))
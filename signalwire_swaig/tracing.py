@@ -0,0 +1,201 @@
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+import os
+import threading
+import time
+
+class Span:
+    """A finished or in-progress span recorded by SWAIGTracer.
+
+    Mirrors the parts of the OpenTelemetry span API SWAIG uses: ``name``,
+    ``attributes``, ``start_time``/``end_time`` in nanoseconds and
+    ``set_attribute``/``end``.
+    """
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "attributes", "start_time", "end_time", "_tracer")
+
+    def __init__(self, tracer: "SWAIGTracer", name: str, parent: Optional["Span"], attributes: Optional[Dict[str, Any]]):
+        self._tracer = tracer
+        self.name = name
+        self.trace_id = parent.trace_id if parent is not None else os.urandom(16).hex()
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent.span_id if parent is not None else None
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.start_time = time.time_ns()
+        self.end_time: Optional[int] = None
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def end(self):
+        if self.end_time is None:
+            self.end_time = time.time_ns()
+            self._tracer.exporter.export([self])
+
+    @property
+    def duration_ms(self) -> Optional[float]:
+        return (self.end_time - self.start_time) / 1e6 if self.end_time is not None else None
+
+    def __repr__(self):
+        return f"Span(name={self.name!r}, duration_ms={self.duration_ms}, attributes={self.attributes!r})"
+
+class InMemorySpanExporter:
+    """Keeps finished spans in a list; meant for tests and debugging."""
+
+    def __init__(self):
+        self._spans: List[Span] = []
+        self._lock = threading.Lock()
+
+    def export(self, spans: List[Span]):
+        with self._lock:
+            self._spans.extend(spans)
+
+    def get_finished_spans(self) -> List[Span]:
+        with self._lock:
+            return list(self._spans)
+
+    def clear(self):
+        with self._lock:
+            self._spans.clear()
+
+class SWAIGTracer:
+    """Dependency-free tracer whose finished spans go to ``exporter``.
+
+    Any object with the same ``start_span(name, parent=None, attributes=None)``
+    method can be passed as the SWAIG ``tracer``; see OpenTelemetryTracer.
+    """
+
+    def __init__(self, exporter=None):
+        self.exporter = exporter if exporter is not None else InMemorySpanExporter()
+
+    def start_span(self, name: str, parent: Optional[Span] = None, attributes: Optional[Dict[str, Any]] = None) -> Span:
+        return Span(self, name, parent, attributes)
+
+class OpenTelemetryTracer:
+    """Adapts an OpenTelemetry tracer (``trace.get_tracer(...)``) to the SWAIG tracer interface."""
+
+    def __init__(self, tracer=None):
+        from opentelemetry import trace
+        self._trace = trace
+        self._tracer = tracer or trace.get_tracer("signalwire_swaig")
+
+    def start_span(self, name: str, parent=None, attributes: Optional[Dict[str, Any]] = None):
+        context = self._trace.set_span_in_context(parent) if parent is not None else None
+        return self._tracer.start_span(name, context=context, attributes=attributes)
+
+class _Stage:
+    __slots__ = ("trace", "name", "span", "started")
+
+    def __init__(self, trace: "RequestTrace", name: str):
+        self.trace = trace
+        self.name = name
+
+    def __enter__(self):
+        trace = self.trace
+        tracer = trace.tracer
+        self.span = tracer.start_span(f"swaig.{self.name}", parent=trace.root, attributes=dict(trace.attributes)) \
+            if tracer is not None else None
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.started
+        timings = self.trace.timings
+        timings[self.name] = timings.get(self.name, 0.0) + elapsed
+        if self.span is not None:
+            self.span.end()
+        return False
+
+class RequestTrace:
+    """Per-stage timings of one /swaig request.
+
+    Each ``stage`` becomes a child span of the request span when a tracer is
+    attached, and is summed into the Server-Timing header.
+    """
+    enabled = True
+
+    def __init__(self, tracer=None):
+        self.tracer = tracer
+        self.root = tracer.start_span("swaig.request") if tracer is not None else None
+        self.timings: Dict[str, float] = {}
+        self.attributes: Dict[str, Any] = {}
+        self.started = time.perf_counter()
+        self.finished = False
+
+    def stage(self, name: str) -> _Stage:
+        return _Stage(self, name)
+
+    def tag(self, key: str, value: Any):
+        """Tag the request span and the stage spans started after it, e.g. with the function name."""
+        if value is None:
+            return
+        self.attributes[f"swaig.{key}"] = value
+        if self.root is not None:
+            self.root.set_attribute(f"swaig.{key}", value)
+
+    def call(self) -> "CallTrace":
+        """A trace for one call of a batch request, under this request's span."""
+        return CallTrace(self)
+
+    def finish(self):
+        """End the request span; later calls keep the first ``total`` and do not end it again."""
+        if self.finished:
+            return
+        self.finished = True
+        self.timings["total"] = time.perf_counter() - self.started
+        if self.root is not None:
+            self.root.end()
+
+    def server_timing(self) -> str:
+        return ", ".join(f"{name};dur={seconds * 1000:.3f}" for name, seconds in self.timings.items())
+
+class CallTrace(RequestTrace):
+    """One call of a batch request: a ``swaig.call`` span under the request span.
+
+    It carries its own function and token tags, and its stage timings stay
+    out of the request's Server-Timing header, where calls running side by
+    side would add up to more than the request took.
+    """
+
+    def __init__(self, request: RequestTrace):
+        self.tracer = request.tracer
+        self.attributes = dict(request.attributes)
+        self.root = self.tracer.start_span("swaig.call", parent=request.root, attributes=dict(self.attributes)) \
+            if self.tracer is not None else None
+        self.timings = {}
+        self.started = time.perf_counter()
+        self.finished = False
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+class _NullTrace:
+    """Stands in for RequestTrace when tracing is off, so instrumented code needs no checks."""
+    __slots__ = ()
+    enabled = False
+    _stage = _NullStage()
+
+    def stage(self, name: str) -> _NullStage:
+        return self._stage
+
+    def tag(self, key: str, value: Any):
+        pass
+
+    def call(self) -> "_NullTrace":
+        return self
+
+    def finish(self):
+        pass
+
+NULL_TRACE = _NullTrace()
+
+_current_trace: ContextVar[Any] = ContextVar("swaig_request_trace", default=NULL_TRACE)
+
+def current_trace():
+    """Return the RequestTrace of the request being handled (a no-op trace when tracing is off)."""
+    return _current_trace.get()
@@ -0,0 +1,155 @@
+from typing import Any, Callable, Dict, List, Optional
+from .errors import SWAIGValidationError
+
+Validator = Callable[[Any], Any]
+
+_MISSING = object()
+_TRUE_STRINGS = {"true", "1"}
+_FALSE_STRINGS = {"false", "0"}
+
+def _check_string(value):
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return str(value)
+    raise SWAIGValidationError("must be a string")
+
+def _check_integer(value):
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, str):
+        try:
+            return int(value.strip())
+        except ValueError:
+            pass
+    raise SWAIGValidationError("must be an integer")
+
+def _check_number(value):
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return value
+    if isinstance(value, str):
+        try:
+            return float(value.strip())
+        except ValueError:
+            pass
+    raise SWAIGValidationError("must be a number")
+
+def _check_boolean(value):
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, int) and value in (0, 1):
+        return bool(value)
+    if isinstance(value, str):
+        lowered = value.strip().lower()
+        if lowered in _TRUE_STRINGS:
+            return True
+        if lowered in _FALSE_STRINGS:
+            return False
+    raise SWAIGValidationError("must be a boolean")
+
+def _check_any(value):
+    return value
+
+_SCALARS: Dict[str, Validator] = {
+    "string": _check_string,
+    "integer": _check_integer,
+    "number": _check_number,
+    "boolean": _check_boolean,
+}
+
+def _with_enum(check: Validator, enum: List[Any]) -> Validator:
+    allowed = frozenset(enum)
+    reason = f"must be one of {', '.join(map(str, enum))}"
+    def validate(value):
+        value = check(value)
+        if value not in allowed:
+            raise SWAIGValidationError(reason)
+        return value
+    return validate
+
+def _array(check_item: Optional[Validator]) -> Validator:
+    def validate(value):
+        if not isinstance(value, list):
+            raise SWAIGValidationError("must be an array")
+        if check_item is None:
+            return value
+        result = value
+        for index, item in enumerate(value):
+            try:
+                checked = check_item(item)
+            except SWAIGValidationError as e:
+                e.path.insert(0, index)
+                raise
+            if checked is not item:
+                if result is value:
+                    result = list(value)
+                result[index] = checked
+        return result
+    return validate
+
+def _object(checks: Dict[str, Validator], required: List[str], defaults: Dict[str, Any]) -> Validator:
+    check_items = tuple(checks.items())
+    required = tuple(required)
+    def validate(value):
+        if not isinstance(value, dict):
+            raise SWAIGValidationError("must be an object")
+        result = value
+        for name in required:
+            if value.get(name) is None:
+                raise SWAIGValidationError("is required", [name])
+        for name, check in check_items:
+            item = value.get(name, _MISSING)
+            if item is _MISSING:
+                if name in defaults:
+                    if result is value:
+                        result = dict(value)
+                    result[name] = defaults[name]
+                continue
+            if item is None:
+                continue
+            try:
+                checked = check(item)
+            except SWAIGValidationError as e:
+                e.path.insert(0, name)
+                raise
+            if checked is not item:
+                if result is value:
+                    result = dict(value)
+                result[name] = checked
+        return result
+    return validate
+
+def compile_schema(param) -> Validator:
+    """Compile a SWAIGArgument or SWAIGArgumentItems into a validating/coercing closure.
+
+    Mirrors ``build_schema`` so exactly what is advertised in the signature is enforced.
+    """
+    if param.type == "array":
+        items = getattr(param, "items", None)
+        check = _array(compile_schema(items) if items else None)
+    elif param.type == "object":
+        properties = getattr(param, "properties", None)
+        if properties:
+            check = _object({k: compile_schema(v) for k, v in properties.items()}, getattr(param, "required", None) or [], {})
+        else:
+            check = _object({}, [], {})
+    else:
+        check = _SCALARS.get(param.type, _check_any)
+    if getattr(param, "enum", None):
+        check = _with_enum(check, param.enum)
+    return check
+
+def compile_validator(params: Dict[str, Any]) -> Validator:
+    """Compile an endpoint's keyword SWAIGArguments into a validator for the parsed argument dict.
+
+    The validator returns the arguments with coerced values and schema defaults
+    applied, reusing the input dict when nothing changed, and raises
+    SWAIGValidationError for missing, mistyped or out-of-enum values.
+    """
+    return _object(
+        {name: compile_schema(param) for name, param in params.items()},
+        [name for name, param in params.items() if param.required],
+        {name: param.default for name, param in params.items() if param.default is not None},
+    )
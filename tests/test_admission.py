@@ -0,0 +1,68 @@
+import json
+import threading
+import time
+
+from flask import Flask
+
+from signalwire_swaig import SWAIG, SWAIGArgument
+from signalwire_swaig.admission import DEFAULT_RETRY_RESPONSE, AdmissionController, TokenBucket
+
+
+def make_app(admission):
+    app = Flask(__name__)
+    swaig = SWAIG(app, admission=admission)
+
+    @swaig.endpoint("Look something up", query=SWAIGArgument("string", "Query"))
+    def lookup(query=None, meta_data=None, meta_data_token=None):
+        return "found"
+
+    @swaig.endpoint("Expensive search", rate_limit=(0.001, 1))
+    def search(meta_data=None, meta_data_token=None):
+        return "searched"
+
+    return swaig, app.test_client()
+
+
+def call(client, function="lookup", token="t"):
+    body = {"function": function, "argument": {"parsed": [{}]}, "meta_data_token": token}
+    return client.post("/swaig", data=json.dumps(body), content_type="application/json").get_json()["response"]
+
+
+def test_token_bucket_refills_at_its_rate():
+    bucket = TokenBucket(rate=10, burst=2)
+    now = bucket.updated
+    assert bucket.take(now) and bucket.take(now)
+    assert not bucket.take(now)
+    assert bucket.take(now + 0.2)
+
+
+def test_per_token_limit_sheds_only_that_conversation():
+    swaig, client = make_app(AdmissionController(per_token=(0.001, 2)))
+    assert [call(client, token="a") for _ in range(3)] == ["found", "found", DEFAULT_RETRY_RESPONSE]
+    assert call(client, token="b") == "found"
+    assert 'swaig_shed_total{reason="token_rate",function="lookup"} 1' in swaig.metrics.render()
+
+
+def test_endpoint_rate_limit_overrides_per_function():
+    _, client = make_app(AdmissionController(per_function=(1000, 1000), retry_response="Busy."))
+    assert [call(client, "search", token=str(i)) for i in range(2)] == ["searched", "Busy."]
+    assert call(client, "lookup") == "found"
+
+
+def test_concurrency_cap_queues_then_sheds():
+    controller = AdmissionController(max_concurrency=1, max_queue=1, queue_timeout=0.05)
+    assert controller.acquire() is None
+    assert controller.acquire() == "queue_timeout"
+
+    waiting = threading.Thread(target=lambda: results.append(controller.acquire()))
+    results = []
+    controller.queue_timeout = 1
+    waiting.start()
+    while controller._waiting == 0:
+        time.sleep(0.001)
+    assert controller.acquire() == "queue_full"
+    controller.release()
+    waiting.join(2)
+    assert results == [None]
+    controller.release()
+    assert controller.acquire() is None
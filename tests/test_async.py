@@ -0,0 +1,117 @@
+import asyncio
+import base64
+import json
+import threading
+
+from signalwire_swaig import AsyncSWAIG, SWAIGArgument
+from signalwire_swaig.tracing import InMemorySpanExporter, SWAIGTracer
+
+
+def request(app, body, method="POST", headers=(), path="/swaig", query=b""):
+    """Run one HTTP request through the ASGI app; returns (status, headers, body)."""
+    raw = body if isinstance(body, bytes) else json.dumps(body).encode()
+    messages = [{"type": "http.request", "body": raw, "more_body": False}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": method, "path": path, "query_string": query, "scheme": "http",
+             "server": ("testserver", 80), "headers": [(b"host", b"testserver")] + list(headers)}
+    asyncio.run(app(scope, receive, send))
+    start, *chunks = sent
+    return start["status"], dict(start["headers"]), b"".join(chunk.get("body", b"") for chunk in chunks)
+
+
+def basic(username, password):
+    return (b"authorization", b"Basic " + base64.b64encode(f"{username}:{password}".encode()))
+
+
+def make_app(**options):
+    swaig = AsyncSWAIG(**options)
+
+    @swaig.endpoint("Greet asynchronously", name=SWAIGArgument("string", "Name", required=True))
+    async def greet(name, meta_data=None, meta_data_token=None):
+        await asyncio.sleep(0)
+        return f"hello {name}"
+
+    @swaig.endpoint("Report the thread")
+    def where(meta_data=None, meta_data_token=None):
+        return threading.current_thread().name
+
+    @swaig.endpoint("Fail")
+    async def fail(meta_data=None, meta_data_token=None):
+        raise RuntimeError("boom")
+
+    return swaig
+
+
+def call(function, **args):
+    return {"function": function, "argument": {"parsed": [args]}, "meta_data": {}, "meta_data_token": "t"}
+
+
+def test_async_handler_is_awaited():
+    status, _, body = request(make_app(), call("greet", name="Ada"))
+    assert status == 200
+    assert json.loads(body) == {"response": "hello Ada"}
+
+
+def test_sync_handler_runs_off_the_event_loop():
+    status, _, body = request(make_app(), call("where"))
+    assert status == 200
+    assert json.loads(body)["response"] != threading.main_thread().name
+
+
+def test_handler_exception_becomes_error_response():
+    status, _, body = request(make_app(), call("fail"))
+    assert status == 200
+    assert json.loads(body) == {"response": "boom"}
+
+
+def test_get_signature_and_if_none_match():
+    app = make_app()
+    status, headers, body = request(app, {"action": "get_signature"})
+    assert status == 200
+    signatures = json.loads(body)
+    assert [signature["function"] for signature in signatures] == ["greet", "where", "fail"]
+    assert signatures[0]["web_hook_url"] == "https://testserver/swaig"
+    status, _, body = request(app, {"action": "get_signature"}, headers=[(b"if-none-match", headers[b"etag"])])
+    assert status == 304
+    assert body == b""
+
+
+def test_basic_auth():
+    app = make_app(auth=("user", "pass"))
+    assert request(app, call("greet", name="Ada"))[0] == 401
+    assert request(app, call("greet", name="Ada"), headers=[basic("user", "wrong")])[0] == 401
+    assert request(app, call("greet", name="Ada"), headers=[basic("user", "pass")])[0] == 200
+
+
+def test_rejects_bad_requests():
+    app = make_app()
+    assert request(app, b"", method="GET")[0] == 405
+    assert request(app, b"{not json")[0] == 400
+    assert request(app, b"[1, 2]")[0] == 400
+    assert request(app, call("greet", name="Ada"), path="/other")[0] == 404
+
+
+def test_query_selected_registry_is_verified_before_parsing():
+    swaig = make_app(auth=("user", "pass"))
+    swaig.registry("sales", auth=("sales", "secret"))
+    assert request(swaig, b"not json", query=b"registry=sales")[0] == 401
+    assert request(swaig, b"not json", headers=[basic("sales", "secret")], query=b"registry=sales")[0] == 400
+
+
+def test_batch_calls_get_their_own_spans():
+    exporter = InMemorySpanExporter()
+    swaig = make_app(tracer=SWAIGTracer(exporter))
+    status, _, _ = request(swaig, {"action": "batch", "calls": [call("greet", name="Ada"), call("where")]})
+    assert status == 200
+    spans = exporter.get_finished_spans()
+    calls = {span.span_id: span.attributes["swaig.function"] for span in spans if span.name == "swaig.call"}
+    assert sorted(calls.values()) == ["greet", "where"]
+    handlers = {span.parent_id: span.attributes["swaig.function"] for span in spans if span.name == "swaig.handler"}
+    assert handlers == calls
@@ -0,0 +1,75 @@
+import json
+import threading
+import time
+
+from flask import Flask
+
+from signalwire_swaig import SWAIG, SWAIGArgument
+
+
+def make_app(**options):
+    app = Flask(__name__)
+    swaig = SWAIG(app, **options)
+    running = {"now": 0, "peak": 0}
+    lock = threading.Lock()
+
+    @swaig.endpoint("Echo after a delay", text=SWAIGArgument("string", "Text", required=True),
+                    delay=SWAIGArgument("number", "Seconds"))
+    def echo(text, delay=0, meta_data=None, meta_data_token=None):
+        with lock:
+            running["now"] += 1
+            running["peak"] = max(running["peak"], running["now"])
+        time.sleep(delay)
+        with lock:
+            running["now"] -= 1
+        return f"{text} {meta_data_token}"
+
+    return app.test_client(), running
+
+
+def echo(text, delay=0, **extra):
+    return {"function": "echo", "argument": {"parsed": [{"text": text, "delay": delay}]}, **extra}
+
+
+def batch(client, calls, **extra):
+    body = {"action": "batch", "calls": calls, "meta_data": {}, "meta_data_token": "shared", **extra}
+    return client.post("/swaig", data=json.dumps(body), content_type="application/json").get_json()
+
+
+def test_results_keep_call_order_and_inherit_the_token():
+    client, _ = make_app()
+    result = batch(client, [echo("a", 0.02), echo("b"), echo("c", meta_data_token="own")])
+    assert result == {"results": [
+        {"function": "echo", "response": "a shared"},
+        {"function": "echo", "response": "b shared"},
+        {"function": "echo", "response": "c own"},
+    ]}
+
+
+def test_bad_entries_fail_alone():
+    client, _ = make_app()
+    results = batch(client, [echo("a"), "nonsense", {"function": "missing"}])["results"]
+    assert results[0] == {"function": "echo", "response": "a shared"}
+    assert results[1]["function"] is None and "Invalid call format" in results[1]["error"]
+    assert results[2]["function"] == "missing" and "error" in results[2]
+
+
+def test_calls_must_be_a_list():
+    client, _ = make_app()
+    assert "'calls' should be a list" in batch(client, {"function": "echo"})["response"]
+
+
+def test_batch_concurrency_limits_parallel_calls():
+    client, running = make_app(batch_concurrency=2)
+    results = batch(client, [echo(str(i), 0.02) for i in range(6)])["results"]
+    assert [entry["response"] for entry in results] == [f"{i} shared" for i in range(6)]
+    assert running["peak"] == 2
+
+
+def test_batch_timeout_reports_slow_calls():
+    client, _ = make_app(batch_timeout=0.1)
+    started = time.monotonic()
+    results = batch(client, [echo("fast"), echo("slow", 1)])["results"]
+    assert time.monotonic() - started < 0.9
+    assert results[0] == {"function": "echo", "response": "fast shared"}
+    assert results[1] == {"function": "echo", "error": "Timed out"}
@@ -0,0 +1,101 @@
+import json
+import threading
+import time
+
+from flask import Flask
+
+from signalwire_swaig import SWAIG, SWAIGArgument, SWAIGCache
+
+
+def make_app(cache):
+    app = Flask(__name__)
+    swaig = SWAIG(app)
+    calls = []
+
+    @swaig.endpoint("Look up the weather", cache=cache, city=SWAIGArgument("string", "City", required=True),
+                    units=SWAIGArgument("string", "Units"))
+    def weather(city, units="metric", meta_data=None, meta_data_token=None):
+        calls.append(city)
+        return f"{city} #{len(calls)}"
+
+    return app.test_client(), calls
+
+
+def call(client, token="t", **args):
+    body = {"function": "weather", "argument": {"parsed": [args]}, "meta_data_token": token}
+    return client.post("/swaig", data=json.dumps(body), content_type="application/json").get_json()["response"]
+
+
+def test_hits_ignore_argument_order():
+    client, calls = make_app(SWAIGCache(ttl=60))
+    first = client.post("/swaig", data='{"function": "weather", "argument": {"parsed": [{"city": "Oslo", "units": "si"}]}}',
+                        content_type="application/json").get_json()
+    second = client.post("/swaig", data='{"function": "weather", "argument": {"parsed": [{"units": "si", "city": "Oslo"}]}}',
+                         content_type="application/json").get_json()
+    assert first == second == {"response": "Oslo #1"}
+    assert calls == ["Oslo"]
+    assert call(client, city="Rome") == "Rome #2"
+
+
+def test_entries_expire_after_ttl():
+    cache = SWAIGCache(ttl=0.05)
+    client, calls = make_app(cache)
+    assert call(client, city="Oslo") == "Oslo #1"
+    assert call(client, city="Oslo") == "Oslo #1"
+    time.sleep(0.1)
+    assert call(client, city="Oslo") == "Oslo #2"
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 2
+
+
+def test_per_token_scopes_entries():
+    client, calls = make_app(SWAIGCache(ttl=60, per_token=True))
+    assert call(client, token="a", city="Oslo") == "Oslo #1"
+    assert call(client, token="b", city="Oslo") == "Oslo #2"
+    assert call(client, token="a", city="Oslo") == "Oslo #1"
+
+
+def test_concurrent_identical_calls_run_once():
+    cache = SWAIGCache(ttl=60)
+    started = threading.Event()
+    release = threading.Event()
+    runs = []
+
+    def compute():
+        runs.append(1)
+        started.set()
+        release.wait(5)
+        return {"response": "done"}
+
+    results = []
+    first = threading.Thread(target=lambda: results.append(cache.call("key", compute)))
+    first.start()
+    assert started.wait(5)
+    second = threading.Thread(target=lambda: results.append(cache.call("key", compute)))
+    second.start()
+    while cache.stats()["coalesced"] == 0:
+        time.sleep(0.001)
+    release.set()
+    first.join(5)
+    second.join(5)
+    assert results == [{"response": "done"}, {"response": "done"}]
+    assert len(runs) == 1
+    assert cache.stats() == {"hits": 0, "misses": 1, "coalesced": 1, "entries": 1}
+
+
+def test_failures_are_not_cached():
+    cache = SWAIGCache(ttl=60)
+    attempts = []
+
+    def compute():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("upstream down")
+        return {"response": "ok"}
+
+    try:
+        cache.call("key", compute)
+    except RuntimeError:
+        pass
+    assert cache.call("key", compute) == {"response": "ok"}
+    assert len(attempts) == 2
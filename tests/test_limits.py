@@ -0,0 +1,75 @@
+import asyncio
+import json
+
+import pytest
+from flask import Flask
+
+from signalwire_swaig import SWAIG, AsyncSWAIG, SWAIGArgument
+
+
+def make_app(**options):
+    app = Flask(__name__)
+    swaig = SWAIG(app, **options)
+
+    @swaig.endpoint("Read the request", context=True, key=SWAIGArgument("string", "Key", required=True))
+    def read(ctx):
+        return json.dumps({"value": ctx.request.get(ctx.args["key"])})
+
+    @swaig.endpoint("Read fullrequest", key=SWAIGArgument("string", "Key", required=True))
+    def legacy(key, meta_data=None, meta_data_token=None):
+        return json.dumps(meta_data["fullrequest"].get(key))
+
+    return swaig, app.test_client()
+
+
+def body(function, key, **extra):
+    return {"function": function, "argument": {"parsed": [{"key": key}]}, "meta_data": {"a": 1},
+            "meta_data_token": "t", **extra}
+
+
+def test_oversized_body_is_rejected_before_reading():
+    swaig, client = make_app(max_body_size=1024)
+    response = client.post("/swaig", data=json.dumps(body("read", "x", padding="p" * 2000)), content_type="application/json")
+    assert response.status_code == 413
+    assert 'swaig_errors_total{kind="too_large"} 1' in swaig.metrics.render()
+
+
+def test_body_under_the_limit_is_served():
+    _, client = make_app(max_body_size=1024)
+    response = client.post("/swaig", data=json.dumps(body("read", "meta_data_token")), content_type="application/json")
+    assert response.status_code == 200
+    assert json.loads(response.get_json()["response"])["value"] == "t"
+
+
+def test_asgi_limit_without_content_length():
+    swaig = AsyncSWAIG(max_body_size=1024)
+    messages = [{"type": "http.request", "body": b"{" + b" " * 800, "more_body": True},
+                {"type": "http.request", "body": b" " * 800 + b"}", "more_body": False}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(swaig({"type": "http", "method": "POST", "path": "/swaig", "query_string": b"", "headers": []}, receive, send))
+    assert sent[0]["status"] == 413
+
+
+def test_lazy_request_decodes_the_rest_of_the_body_on_access():
+    pytest.importorskip("msgspec")
+    _, client = make_app(lazy_request=True)
+    payload = body("read", "conversation", conversation=[{"role": "user", "content": "hi"}] * 50)
+    result = json.loads(client.post("/swaig", data=json.dumps(payload), content_type="application/json").get_json()["response"])
+    assert result["value"] == payload["conversation"]
+    legacy = client.post("/swaig", data=json.dumps(body("legacy", "meta_data_token")), content_type="application/json")
+    assert json.loads(legacy.get_json()["response"]) == "t"
+
+
+def test_lazy_request_keeps_batches_working():
+    pytest.importorskip("msgspec")
+    _, client = make_app(lazy_request=True)
+    payload = {"action": "batch", "meta_data_token": "t", "calls": [body("legacy", "meta_data_token")]}
+    result = client.post("/swaig", data=json.dumps(payload), content_type="application/json").get_json()
+    assert result["results"][0]["response"] == json.dumps("t")
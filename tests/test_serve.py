@@ -0,0 +1,28 @@
+import gc
+
+from flask import Flask
+
+from signalwire_swaig import SWAIG
+from signalwire_swaig.serve import preload
+
+
+def test_public_url_preload_is_the_body_requests_get():
+    app = Flask(__name__)
+    swaig = SWAIG(app)
+    sales = swaig.registry("sales", path="/agents/sales")
+
+    @swaig.endpoint("Say hi")
+    def hello(meta_data=None, meta_data_token=None):
+        return "hi"
+
+    try:
+        preload(app, public_url="https://agent.example.com")
+    finally:
+        if hasattr(gc, "unfreeze"):
+            gc.unfreeze()
+    assert list(swaig._signature_cache) == [("https://agent.example.com/", None)]
+    client = app.test_client()
+    response = client.post("/swaig", json={"action": "get_signature"}, headers={"Host": "127.0.0.1:5000"})
+    assert response.get_json()[0]["web_hook_url"] == "https://agent.example.com/swaig"
+    assert len(swaig._signature_cache) == 1
+    assert sales.public_url == "https://agent.example.com/"
@@ -0,0 +1,93 @@
+import json
+
+import pytest
+from flask import Flask
+
+from signalwire_swaig import SWAIG, SignatureSnapshotError, SWAIGArgument
+
+
+def make_app(description="Say hi", extra=False, **options):
+    app = Flask(__name__)
+    swaig = SWAIG(app, **options)
+
+    @swaig.endpoint(description, name=SWAIGArgument("string", "Name"))
+    def hello(name=None, meta_data=None, meta_data_token=None):
+        return "hi"
+
+    sales = swaig.registry("sales", path="/agents/sales")
+
+    @sales.endpoint("Quote", sku=SWAIGArgument("string", "SKU", required=True))
+    def quote(sku, meta_data=None, meta_data_token=None):
+        return sku
+
+    if extra:
+        @swaig.endpoint("Added later")
+        def later(meta_data=None, meta_data_token=None):
+            return "later"
+
+    return swaig, app.test_client()
+
+
+def test_export_has_no_urls_and_round_trips(tmp_path):
+    swaig, _ = make_app(auth=("user", "secret"))
+    path = tmp_path / "signatures.json"
+    snapshot = swaig.export_signatures(str(path))
+    assert json.loads(path.read_text()) == snapshot
+    assert [entry["function"] for entry in snapshot["registries"][""]] == ["hello"]
+    assert [entry["function"] for entry in snapshot["registries"]["sales"]] == ["quote"]
+    assert "secret" not in path.read_text()
+    assert "web_hook_url" not in path.read_text()
+    assert make_app()[0].load_signatures(str(path)) == []
+
+
+def test_changed_added_and_removed_functions_are_reported():
+    snapshot = make_app()[0].export_signatures()
+    swaig, _ = make_app(description="Say hello", extra=True)
+    with pytest.raises(SignatureSnapshotError) as raised:
+        swaig.load_signatures(snapshot)
+    assert sorted(raised.value.problems) == ["hello changed since the snapshot was taken", "later is not in the snapshot"]
+    assert make_app(extra=True)[0].load_signatures(snapshot, strict=False) == ["later is not in the snapshot"]
+
+    grown = make_app(extra=True)[0].export_signatures()
+    assert make_app()[0].load_signatures(grown, strict=False) == ["later is in the snapshot but not registered"]
+
+
+def test_reordered_functions_are_reported():
+    snapshot = make_app(extra=True)[0].export_signatures()
+    snapshot["registries"][""].reverse()
+    problems = make_app(extra=True)[0].load_signatures(snapshot, strict=False)
+    assert problems == ["registry '' lists its functions in a different order"]
+
+
+def test_public_url_serves_every_host_from_one_prebuilt_body():
+    swaig, client = make_app(public_url="https://agent.example.com")
+    swaig.load_signatures(swaig.export_signatures())
+    assert list(swaig._signature_cache) == [("https://agent.example.com/", None)]
+    first = client.post("/swaig", json={"action": "get_signature"}, headers={"Host": "a.internal"})
+    second = client.post("/swaig", json={"action": "get_signature"}, headers={"Host": "b.internal:8080"})
+    assert first.data == second.data
+    assert first.headers["ETag"] == second.headers["ETag"]
+    assert first.get_json()[0]["web_hook_url"] == "https://agent.example.com/swaig"
+    assert len(swaig._signature_cache) == 1
+
+
+@pytest.mark.parametrize("snapshot", [
+    [1, 2],
+    {"format": "something-else", "version": 1, "registries": {}},
+    {"format": "signalwire-swaig-signatures", "version": 1, "registries": {"": "hello"}},
+    {"format": "signalwire-swaig-signatures", "version": 1, "registries": {"": [1]}},
+])
+def test_malformed_snapshots_are_rejected(snapshot):
+    swaig, _ = make_app()
+    with pytest.raises(SignatureSnapshotError) as raised:
+        swaig.load_signatures(snapshot)
+    assert raised.value.problems == ["not a version 1 signature snapshot"]
+
+
+def test_host_url_is_prebuilt_without_public_url():
+    swaig, client = make_app()
+    swaig.load_signatures(swaig.export_signatures(), host_url="https://agent.example.com")
+    assert list(swaig._signature_cache) == [("https://agent.example.com/", None)]
+    response = client.post("/swaig", json={"action": "get_signature"}, headers={"Host": "agent.example.com"})
+    assert response.get_json()[0]["web_hook_url"] == "https://agent.example.com/swaig"
+    assert len(swaig._signature_cache) == 1
@@ -0,0 +1,86 @@
+import json
+
+import pytest
+from flask import Flask
+
+from signalwire_swaig import SWAIG, MetaDataStore, RedisMetaDataStore, SWAIGArgument
+
+
+class FakeRedis:
+    """In-memory stand-in for the redis-py client methods RedisMetaDataStore uses."""
+
+    def __init__(self):
+        self.data = {}
+        self.expiry = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+        self.expiry[key] = ex
+
+    def delete(self, key):
+        self.data.pop(key, None)
+        self.expiry.pop(key, None)
+
+
+def make_app(store):
+    app = Flask(__name__)
+    swaig = SWAIG(app, meta_data_store=store)
+
+    @swaig.endpoint("Remember a name", context=True, name=SWAIGArgument("string", "Name"))
+    def remember(ctx):
+        if ctx.args.get("name"):
+            ctx.state["name"] = ctx.args["name"]
+        return f"name is {ctx.state.get('name')}"
+
+    @swaig.endpoint("Forget the name", context=True)
+    def forget(ctx):
+        ctx.state.pop("name", None)
+        return "forgotten"
+
+    return app.test_client()
+
+
+def call(client, function, token="conv-1", **args):
+    body = {"function": function, "argument": {"parsed": [args]}, "meta_data": {}, "meta_data_token": token}
+    return client.post("/swaig", data=json.dumps(body), content_type="application/json").get_json()
+
+
+def test_redis_store_round_trip_with_ttl():
+    redis = FakeRedis()
+    store = RedisMetaDataStore(redis, prefix="t:", ttl=60)
+    store.set("abc", {"a": 1})
+    assert store.get("abc") == {"a": 1}
+    assert redis.expiry["t:abc"] == 60
+    store.delete("abc")
+    assert store.get("abc") is None
+
+
+def test_state_persists_between_calls_and_emits_actions():
+    redis = FakeRedis()
+    client = make_app(RedisMetaDataStore(redis))
+    first = call(client, "remember", name="Ada")
+    assert first["response"] == "name is Ada"
+    assert first["action"] == [{"set_meta_data": {"name": "Ada"}}]
+
+    second = call(client, "remember")
+    assert second == {"response": "name is Ada"}
+    assert call(client, "remember", token="conv-2") == {"response": "name is None"}
+
+    third = call(client, "forget")
+    assert third["action"] == [{"unset_meta_data": ["name"]}]
+    assert call(client, "remember") == {"response": "name is None"}
+
+
+def test_store_missing_a_method_fails_at_construction():
+    class NoDeleteStore(MetaDataStore):
+        def get(self, token):
+            return None
+
+        def set(self, token, data):
+            pass
+
+    with pytest.raises(TypeError):
+        NoDeleteStore()
@@ -0,0 +1,77 @@
+import asyncio
+import json
+import time
+
+from flask import Flask
+
+from signalwire_swaig import SWAIG, SWAIGArgument, SWAIGResponse
+
+
+def make_app(**options):
+    app = Flask(__name__)
+    swaig = SWAIG(app, **options)
+
+    @swaig.endpoint("Sleep", timeout=0.1, fallback=SWAIGResponse("Still looking, one moment."),
+                    seconds=SWAIGArgument("number", "Seconds", required=True))
+    def nap(seconds, meta_data=None, meta_data_token=None):
+        time.sleep(seconds)
+        return "rested"
+
+    @swaig.endpoint("Sleep asynchronously", timeout=0.1, seconds=SWAIGArgument("number", "Seconds", required=True))
+    async def async_nap(seconds, meta_data=None, meta_data_token=None):
+        await asyncio.sleep(seconds)
+        return "rested"
+
+    @swaig.endpoint("Sleep with the default deadline", seconds=SWAIGArgument("number", "Seconds", required=True))
+    def default_nap(seconds, meta_data=None, meta_data_token=None):
+        time.sleep(seconds)
+        return "rested"
+
+    return app.test_client()
+
+
+def call(client, function, seconds):
+    body = {"function": function, "argument": {"parsed": [{"seconds": seconds}]}}
+    started = time.monotonic()
+    response = client.post("/swaig", data=json.dumps(body), content_type="application/json").get_json()
+    return response, time.monotonic() - started
+
+
+def test_handler_within_its_deadline_answers():
+    response, _ = call(make_app(), "nap", 0)
+    assert response == {"response": "rested"}
+
+
+def test_late_handler_gets_the_fallback_at_the_deadline():
+    response, elapsed = call(make_app(), "nap", 1)
+    assert response == {"response": "Still looking, one moment."}
+    assert elapsed < 0.5
+
+
+def test_late_async_handler_gets_the_default_response():
+    response, elapsed = call(make_app(timeout_response="Please hold."), "async_nap", 1)
+    assert response == {"response": "Please hold."}
+    assert elapsed < 0.5
+
+
+def test_default_timeout_applies_to_functions_without_their_own():
+    client = make_app(default_timeout=0.1, timeout_response="Please hold.")
+    assert call(client, "default_nap", 1)[0] == {"response": "Please hold."}
+    assert call(client, "default_nap", 0)[0] == {"response": "rested"}
+    assert call(make_app(), "default_nap", 0.2)[0] == {"response": "rested"}
+
+
+def test_batch_calls_with_deadlines_do_not_wait_behind_each_other():
+    app = Flask(__name__)
+    swaig = SWAIG(app, max_workers=2)
+
+    @swaig.endpoint("Quick", timeout=0.5, fallback="fallback")
+    def quick(meta_data=None, meta_data_token=None):
+        time.sleep(0.01)
+        return "done"
+
+    body = {"action": "batch", "calls": [{"function": "quick", "argument": {"parsed": [{}]}}] * 4}
+    started = time.monotonic()
+    results = app.test_client().post("/swaig", data=json.dumps(body), content_type="application/json").get_json()["results"]
+    assert [entry["response"] for entry in results] == ["done"] * 4
+    assert time.monotonic() - started < 0.4
@@ -0,0 +1,116 @@
+import json
+
+from flask import Flask
+
+from signalwire_swaig import SWAIG, SWAIGArgument
+from signalwire_swaig.tracing import InMemorySpanExporter, SWAIGTracer
+
+
+def make_app(**options):
+    app = Flask(__name__)
+    swaig = SWAIG(app, **options)
+
+    @swaig.endpoint("Echo the text", text=SWAIGArgument("string", "Text"))
+    def echo(text, meta_data=None, meta_data_token=None):
+        return text
+
+    @swaig.endpoint("Shout the text", text=SWAIGArgument("string", "Text"))
+    def shout(text, meta_data=None, meta_data_token=None):
+        return text.upper()
+
+    return app.test_client()
+
+
+def call(client):
+    body = {"function": "echo", "argument": {"parsed": [{"text": "hi"}]}, "meta_data_token": "conv-1"}
+    return client.post("/swaig", data=json.dumps(body), content_type="application/json")
+
+
+def test_spans_per_stage_tagged_with_function_and_token():
+    exporter = InMemorySpanExporter()
+    response = call(make_app(tracer=SWAIGTracer(exporter)))
+    assert response.status_code == 200
+
+    spans = exporter.get_finished_spans()
+    names = [span.name for span in spans]
+    assert names.count("swaig.request") == 1
+    assert {"swaig.parse", "swaig.prepare", "swaig.handler", "swaig.serialize"} <= set(names)
+    root = next(span for span in spans if span.name == "swaig.request")
+    assert all(span.parent_id == root.span_id for span in spans if span is not root)
+    assert root.attributes["swaig.function"] == "echo"
+    assert root.attributes["swaig.meta_data_token"] == "conv-1"
+    handler = next(span for span in spans if span.name == "swaig.handler")
+    assert handler.attributes["swaig.function"] == "echo"
+
+    exporter.clear()
+    assert exporter.get_finished_spans() == []
+
+
+def test_server_timing_header():
+    response = call(make_app(server_timing=True))
+    stages = [part.split(";")[0] for part in response.headers["Server-Timing"].split(", ")]
+    assert stages[-1] == "total"
+    assert "handler" in stages
+
+
+def batch(client):
+    body = {"action": "batch", "calls": [
+        {"function": "echo", "argument": {"parsed": [{"text": "hi"}]}, "meta_data_token": "conv-1"},
+        {"function": "shout", "argument": {"parsed": [{"text": "hi"}]}, "meta_data_token": "conv-2"},
+    ]}
+    return client.post("/swaig", data=json.dumps(body), content_type="application/json")
+
+
+def test_batch_calls_get_their_own_spans():
+    exporter = InMemorySpanExporter()
+    response = batch(make_app(tracer=SWAIGTracer(exporter), server_timing=True))
+    assert response.status_code == 200
+
+    spans = exporter.get_finished_spans()
+    root = next(span for span in spans if span.name == "swaig.request")
+    assert "swaig.function" not in root.attributes
+    calls = {span.attributes["swaig.function"]: span for span in spans if span.name == "swaig.call"}
+    assert set(calls) == {"echo", "shout"}
+    assert all(span.parent_id == root.span_id for span in calls.values())
+    assert calls["shout"].attributes["swaig.meta_data_token"] == "conv-2"
+    parents = {span.span_id: span for span in calls.values()}
+    handlers = [span for span in spans if span.name == "swaig.handler"]
+    assert {span.parent_id for span in handlers} == set(parents)
+    assert all(span.attributes["swaig.function"] == parents[span.parent_id].attributes["swaig.function"] for span in handlers)
+
+    stages = [part.split(";")[0] for part in response.headers["Server-Timing"].split(", ")]
+    assert "handler" not in stages and "prepare" not in stages
+    assert stages[-1] == "total"
+
+
+def test_no_tracer_adds_no_header():
+    assert "Server-Timing" not in call(make_app()).headers
+
+
+class CountingTracer:
+    """Tracer whose spans record every end() call, as OpenTelemetry would warn about repeats."""
+
+    def __init__(self):
+        self.ended = []
+
+    def start_span(self, name, parent=None, attributes=None):
+        return CountingSpan(self, name)
+
+
+class CountingSpan:
+    def __init__(self, tracer, name):
+        self.tracer = tracer
+        self.name = name
+
+    def set_attribute(self, key, value):
+        pass
+
+    def end(self):
+        self.tracer.ended.append(self.name)
+
+
+def test_request_span_ends_once():
+    tracer = CountingTracer()
+    response = call(make_app(tracer=tracer, server_timing=True))
+    assert response.headers["Server-Timing"]
+    assert tracer.ended.count("swaig.request") == 1
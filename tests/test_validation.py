@@ -0,0 +1,55 @@
+import json
+
+from flask import Flask
+
+from signalwire_swaig import SWAIG, SWAIGArgument, SWAIGArgumentItems
+
+
+def make_app():
+    app = Flask(__name__)
+    swaig = SWAIG(app)
+
+    @swaig.endpoint("Book a table",
+                    guests=SWAIGArgument("integer", "Party size", required=True),
+                    outdoor=SWAIGArgument("boolean", "Sit outside"),
+                    area=SWAIGArgument("string", "Area", enum=["bar", "patio"]),
+                    note=SWAIGArgument("string", "Note", default="none"),
+                    seats=SWAIGArgument("array", "Seat numbers", items=SWAIGArgumentItems("integer")))
+    def book(guests, outdoor=None, area=None, note=None, seats=None, meta_data=None, meta_data_token=None):
+        return json.dumps({"guests": guests, "outdoor": outdoor, "area": area, "note": note, "seats": seats})
+
+    @swaig.endpoint("Echo without validation", validate=False, count=SWAIGArgument("integer", "Count", required=True))
+    def raw(count, meta_data=None, meta_data_token=None):
+        return json.dumps(count)
+
+    return app.test_client()
+
+
+def call(client, function, **args):
+    body = {"function": function, "argument": {"parsed": [args]}}
+    return client.post("/swaig", data=json.dumps(body), content_type="application/json").get_json()["response"]
+
+
+def test_valid_arguments_are_coerced_and_defaulted():
+    result = json.loads(call(make_app(), "book", guests="4", outdoor="true", area="patio", seats=["1", 2]))
+    assert result == {"guests": 4, "outdoor": True, "area": "patio", "note": "none", "seats": [1, 2]}
+
+
+def test_missing_required_argument_is_rejected():
+    assert "is required" in call(make_app(), "book", outdoor=True)
+
+
+def test_enum_is_enforced():
+    message = call(make_app(), "book", guests=2, area="roof")
+    assert "Invalid arguments for function 'book'" in message
+    assert "must be one of bar, patio" in message
+
+
+def test_types_are_enforced_inside_arrays():
+    assert "must be an integer" in call(make_app(), "book", guests=2, seats=["one"])
+    assert "must be an integer" in call(make_app(), "book", guests="many")
+    assert "must be a boolean" in call(make_app(), "book", guests=2, outdoor="maybe")
+
+
+def test_validate_false_passes_arguments_through():
+    assert json.loads(call(make_app(), "raw", count="not a number")) == "not a number"